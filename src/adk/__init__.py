@@ -1,9 +1,16 @@
-from . import agent
+import importlib
 
-# from adk.agent import root_agent
+# agent pulls in google-adk, Vertex AI and the Slack/Firestore clients, so it's only imported once
+# ADK asks for it. Stdlib-only modules such as adk.webhook_replay stay importable offline.
+def __getattr__(name):
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    if name == "root_agent":
+        return importlib.import_module(".agent", __name__).root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # from adk.agent import root_agent
 # from name_email_map import NAME_EMAIL_MAP
 # from .slack_tools import post_approval_message, get_slack_user_id
 
-# __all__ = ["root_agent"]
\ No newline at end of file
+# __all__ = ["root_agent"]
@@ -1,7 +1,7 @@
 import os, json, requests, uuid
 from google.adk.agents import SequentialAgent, LlmAgent, BaseAgent
-from .slack_tools import post_approval_message
-from .linear_tools import get_issues, compare, input_for_slack, callback, update_linear_priority, match_issue, handle_dm_update, list_linear_issues, handle_metrics
+from .slack_tools import post_approval_message, post_approval_messages
+from .linear_tools import get_issues, compare, input_for_slack, callback, update_linear_priority, update_linear_issues_batch, match_issue, handle_dm_update, list_linear_issues, handle_metrics
 
 ADK_BASE_URL = "https://adk-service-668646793196.us-central1.run.app"
 ROUTING_AGENT_NAME = "adk"
@@ -56,13 +56,14 @@ linear_dm_agent = LlmAgent(
     instruction=(
         "You are given natural language question or command regarding data in Linear."
         "Your job is to determine which tool best fits this message and respond to the best of your ability."
-        "Use the list_linear_issues tool if the message is asking for issues in Linear"
+        "Use the list_linear_issues tool if the message is asking for issues in Linear. Pass assignee, state, priority, team and order_by filters from the message instead of listing everything, and if the message contains 'next page cursor: <cursor>' pass that cursor. Reply with the tool's output as-is, keeping its last line with the cursor"
         "Use update_linear_priority tool if the message is asking to change a task's priority by first calling match_issue. Use context from the message to match to a number from: 0= No priority, 1= Urgent, 2= High, 3= Medium, 4= Low. Next, send the parameter in the form task_data = {'title': '<output of match_issue>,'priority': <number 0-4>}"
         "Use the handle_dm_update tool if given a query that mentions a status change like 'In Progress', 'In Review', 'Done', etc"
+        "Use update_linear_issues_batch if the message asks to change the status or priority of several issues at once, sending one list of {'title': ..., 'status': ...} or {'title': ..., 'priority': <number 0-4>} items instead of calling the single-issue tools repeatedly. If an update result asks 'Did you mean ...?', reply with that question instead of retrying with the suggested title."
         "Use the handle_metrics tool for all other questions regarding metrics. These include but are not limited to number of tasks in different statuses, any data filtered by name, average time for tasks, number of tasks in different statuses, information of tasks done by certain names etc. Be sure to include all relevant details in the output." 
         "Do not include any info regarding your workflow like 'I will transfer you to <AdkAgent>' in any of the outputs"
     ),
-    tools = [get_issues, match_issue, update_linear_priority, handle_dm_update, list_linear_issues, handle_metrics]
+    tools = [get_issues, match_issue, update_linear_priority, update_linear_issues_batch, handle_dm_update, list_linear_issues, handle_metrics]
 )
 
 # --- Slack Agent ---
@@ -73,9 +74,10 @@ slack_agent = LlmAgent(
     instruction=(
         "You are given a Linear task's expected and current status which needs an update."
         "Your job is to notify these differences in Slack using post_approval_message."
+        "When several tasks need approval, send them all in one post_approval_messages call instead of calling post_approval_message repeatedly."
         "When a reaction is given and handle_reaction_added is used, post what happens"
     ),
-    tools = [post_approval_message]
+    tools = [post_approval_message, post_approval_messages]
 )
 
 # --- Orchestrator ---
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from google.cloud import bigquery
+
+# Queries estimated (by dry run) to scan more than this are refused, and it's enforced as maximum_bytes_billed
+MAX_BYTES_BILLED = int(os.getenv("BQ_MAX_BYTES_BILLED", str(1024 ** 3)))
+# Rows returned to Slack; the rest of the result is never downloaded
+MAX_ROWS = int(os.getenv("BQ_MAX_ROWS", "50"))
+RESULT_CACHE_SIZE = int(os.getenv("BQ_RESULT_CACHE_SIZE", "128"))
+# How long the latest ingestion_timestamp is trusted before it's checked again
+INGESTION_CHECK_INTERVAL = float(os.getenv("BQ_INGESTION_CHECK_INTERVAL", "60"))
+
+LATEST_INGESTION_QUERY = "SELECT MAX(ingestion_timestamp) AS latest FROM `linear_metrics_dev.linear_tasks`"
+
+
+class BigQueryExecutor:
+    """
+    Shared BigQuery client that dry-runs generated SQL to check bytes scanned, enforces
+    maximum_bytes_billed, caps the rows read back, and caches results per snapshot load.
+
+    Results are keyed by the SQL and the latest ingestion_timestamp, so a repeated question
+    is answered from memory until the next snapshot is loaded into linear_metrics_dev.
+    """
+
+    def __init__(self, get_credentials, project_id: str, max_bytes_billed: int = MAX_BYTES_BILLED,
+                 max_rows: int = MAX_ROWS, cache_size: int = RESULT_CACHE_SIZE):
+        self._get_credentials = get_credentials
+        self.project_id = project_id
+        self.max_bytes_billed = max_bytes_billed
+        self.max_rows = max_rows
+        self.cache_size = cache_size
+        self._client = None
+        self._results = OrderedDict()
+        self._latest = None
+        self._latest_checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> bigquery.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = bigquery.Client(credentials=self._get_credentials(), project=self.project_id)
+        return self._client
+
+    def run(self, sql: str) -> dict:
+        try:
+            snapshot = self.latest_ingestion()
+            key = (" ".join(sql.split()), snapshot)
+            with self._lock:
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    return self._results[key]
+
+            dry_run = self.client.query(sql, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+            if dry_run.total_bytes_processed > self.max_bytes_billed:
+                return {
+                    "status": "error",
+                    "message": f"Query would scan {dry_run.total_bytes_processed} bytes, over the {self.max_bytes_billed} byte limit."
+                }
+
+            job = self.client.query(sql, job_config=bigquery.QueryJobConfig(maximum_bytes_billed=self.max_bytes_billed))
+            # One extra row tells us whether the result was truncated without reading the rest
+            row_iter = job.result(max_results=self.max_rows + 1)
+            rows = [dict(row) for row in row_iter]
+            result = {
+                "status": "success",
+                "rows": rows[:self.max_rows],
+                "truncated": len(rows) > self.max_rows,
+                "total_rows": row_iter.total_rows
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return result
+
+    def latest_ingestion(self):
+        """Latest ingestion_timestamp, re-queried at most every INGESTION_CHECK_INTERVAL seconds."""
+        now = time.monotonic()
+        if self._latest_checked_at is not None and now - self._latest_checked_at < INGESTION_CHECK_INTERVAL:
+            return self._latest
+        rows = list(self.client.query(LATEST_INGESTION_QUERY).result())
+        latest = rows[0]["latest"] if rows else None
+        with self._lock:
+            if latest != self._latest:
+                # Every cached result belongs to an older snapshot now
+                self._results.clear()
+            self._latest = latest
+            self._latest_checked_at = now
+        return latest
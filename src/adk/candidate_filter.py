@@ -0,0 +1,65 @@
+import os
+
+from .issue_index import normalize_title
+from .name_email_map import NAME_EMAIL_MAP
+from .semantic_matcher import STOPWORDS
+
+# Number of issues sent to the model and how each signal contributes to an issue's score
+COMPARE_TOP_K = int(os.getenv("COMPARE_TOP_K", "10"))
+TITLE_WEIGHT = float(os.getenv("COMPARE_TITLE_WEIGHT", "1.0"))
+DESCRIPTION_WEIGHT = float(os.getenv("COMPARE_DESCRIPTION_WEIGHT", "0.3"))
+ASSIGNEE_WEIGHT = float(os.getenv("COMPARE_ASSIGNEE_WEIGHT", "0.5"))
+# Description characters both scored and sent to the model, so ranking only uses text Gemini sees
+MAX_DESCRIPTION_CHARS = int(os.getenv("COMPARE_MAX_DESCRIPTION_CHARS", "200"))
+
+def _tokens(text: str) -> set[str]:
+    return {word for word in normalize_title(text).split() if word not in STOPWORDS}
+
+def _overlap(task_tokens: set[str], text: str) -> float:
+    """Fraction of the task's tokens found in text, also crediting shared 4-letter stems."""
+    if not task_tokens:
+        return 0.0
+    tokens = _tokens(text)
+    stems = {token[:4] for token in tokens}
+    hits = sum(1.0 if token in tokens else 0.5 if token[:4] in stems else 0.0 for token in task_tokens)
+    return hits / len(task_tokens)
+
+def assignee_matches(name: str, issue: dict) -> bool:
+    """True if the standup task's owner is the issue's assignee, by name or by mapped email."""
+    assignee = issue.get("assignee") or {}
+    if not name or not assignee:
+        return False
+    name = normalize_title(name)
+    email = NAME_EMAIL_MAP.get(name)
+    if email and (assignee.get("email") or "").lower() == email:
+        return True
+    return normalize_title(assignee.get("name")) == name
+
+def score_issue(task_data: dict, issue: dict) -> float:
+    task_tokens = _tokens(task_data.get("task", ""))
+    score = TITLE_WEIGHT * _overlap(task_tokens, issue.get("title", ""))
+    score += DESCRIPTION_WEIGHT * _overlap(task_tokens, (issue.get("description") or "")[:MAX_DESCRIPTION_CHARS])
+    if assignee_matches(task_data.get("name", ""), issue):
+        score += ASSIGNEE_WEIGHT
+    return score
+
+def select_candidates(task_data: dict, issues: list[dict], k: int = COMPARE_TOP_K, scorer=score_issue) -> list[dict]:
+    """Returns the k issues most relevant to the standup task, dropping ones with no signal at all."""
+    scored = [(scorer(task_data, issue), issue) for issue in issues]
+    scored = [item for item in scored if item[0] > 0]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [issue for _, issue in scored[:k]]
+
+def compact_issue(issue: dict) -> dict:
+    """Only the fields compare() needs, with the description truncated."""
+    description = issue.get("description") or ""
+    return {
+        "title": issue.get("title"),
+        "state": (issue.get("state") or {}).get("name"),
+        "assignee": (issue.get("assignee") or {}).get("name"),
+        "description": description[:MAX_DESCRIPTION_CHARS]
+    }
+
+def estimate_tokens(text: str) -> int:
+    """Rough Gemini token count (~4 characters per token), good enough to compare prompt sizes."""
+    return len(text) // 4
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+# Seconds a snapshot may be served before an incremental refresh is attempted
+DEFAULT_MAX_STALENESS = float(os.getenv("LINEAR_ISSUE_CACHE_MAX_STALENESS", "60"))
+# After a failed refresh the stale snapshot is served for this long before Linear is tried again.
+# A failed full load has nothing to serve, so reads fail fast with IssueFetchError for as long.
+REFRESH_RETRY_INTERVAL = float(os.getenv("LINEAR_ISSUE_CACHE_RETRY_INTERVAL", "30"))
+
+
+class IssueFetchError(Exception):
+    """Raised by an issue fetcher when Linear can't be reached or returns an error."""
+
+
+class IssueCache:
+    """
+    Process-wide, in-memory snapshot of Linear issues.
+
+    The first read does a full load, later reads are served from memory until the
+    snapshot is older than max_staleness, at which point only issues updated since
+    the last seen updatedAt are fetched and merged in.
+
+    fetch(since) must return a list of issue nodes (each with id and updatedAt) and
+    raise IssueFetchError on failure. since is None for a full load.
+    """
+
+    def __init__(self, fetch, max_staleness: float = DEFAULT_MAX_STALENESS, retry_interval: float = REFRESH_RETRY_INTERVAL):
+        self._fetch = fetch
+        self.max_staleness = max_staleness
+        self.retry_interval = retry_interval
+        self._retry_at = None
+        self._issues = {}
+        self._watermark = None
+        # Newest updatedAt seen from pushed changes, kept apart from the refresh watermark
+        self._pushed_watermark = None
+        self._loaded_at = None
+        self._lock = threading.RLock()
+        self.version = 0
+        self._views = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "full_loads": 0,
+            "issues_fetched": 0,
+            "errors": 0,
+        }
+
+    def get_issues(self, max_staleness: float | None = None) -> list[dict]:
+        """Returns the current issue list, loading or refreshing it first if needed."""
+        max_staleness = self.max_staleness if max_staleness is None else max_staleness
+        with self._lock:
+            if self._loaded_at is None:
+                self._stats["misses"] += 1
+                self._full_load()
+            elif time.monotonic() - self._loaded_at > max_staleness and not self._backing_off():
+                self._stats["refreshes"] += 1
+                self._refresh()
+            else:
+                self._stats["hits"] += 1
+            return list(self._issues.values())
+
+    def view(self, builder, max_staleness: float | None = None):
+        """
+        Returns builder(issues) for the current snapshot, rebuilding it only when the
+        snapshot version changes. Used for indexes derived from the issue list.
+        """
+        with self._lock:
+            issues = self.get_issues(max_staleness)
+            cached = self._views.get(builder)
+            if cached is None or cached[0] != self.version:
+                cached = (self.version, builder(issues))
+                self._views[builder] = cached
+            return cached[1]
+
+    @property
+    def snapshot_id(self) -> str | None:
+        """Content-derived id of the current snapshot, stable across processes unlike version."""
+        if self._loaded_at is None:
+            return None
+        return f"{self._watermark}:{self._pushed_watermark}:{len(self._issues)}"
+
+    @property
+    def has_snapshot(self) -> bool:
+        return self._loaded_at is not None
+
+    def is_fresh(self, max_staleness: float | None = None) -> bool:
+        max_staleness = self.max_staleness if max_staleness is None else max_staleness
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at <= max_staleness
+
+    def expire(self):
+        """Forces an incremental refresh on the next read, e.g. after a local mutation."""
+        with self._lock:
+            if self._loaded_at is not None:
+                self._loaded_at = float("-inf")
+                self._retry_at = None
+
+    def invalidate(self):
+        """Forces a full reload on the next read."""
+        with self._lock:
+            self._loaded_at = None
+            self._retry_at = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._issues), "version": self.version}
+
+    def apply_changes(self, nodes: list[dict]) -> bool:
+        """
+        Applies issue nodes pushed from elsewhere (e.g. webhooks); nodes with archivedAt set are
+        removed. Ignored until the first full load. The refresh watermark isn't advanced, so a
+        missed push is still picked up by the next incremental refresh.
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return False
+            changed = self._apply(nodes, advance_watermark=False)
+            for node in nodes:
+                updated_at = node.get("updatedAt")
+                if updated_at and (self._pushed_watermark is None or updated_at > self._pushed_watermark):
+                    self._pushed_watermark = updated_at
+            if changed:
+                self.version += 1
+            return True
+
+    def get_issue(self, issue_id: str) -> dict | None:
+        with self._lock:
+            return self._issues.get(issue_id)
+
+    def _backing_off(self) -> bool:
+        return self._retry_at is not None and time.monotonic() < self._retry_at
+
+    def _full_load(self):
+        if self._backing_off():
+            raise IssueFetchError(f"Linear issue load failed recently, retrying in {self._retry_at - time.monotonic():.0f}s")
+        try:
+            nodes = self._fetch(None)
+        except IssueFetchError as e:
+            # Every tool call would otherwise repeat the whole workspace load and wait out the
+            # client deadline while Linear is down
+            self._stats["errors"] += 1
+            self._retry_at = time.monotonic() + self.retry_interval
+            print(f"Full issue load failed, not retrying for {self.retry_interval}s: {e}")
+            raise
+        self._issues = {}
+        self._watermark = None
+        self._pushed_watermark = None
+        self._apply(nodes)
+        self._stats["full_loads"] += 1
+        self.version += 1
+        self._loaded_at = time.monotonic()
+        self._retry_at = None
+        print(f"Issue cache full load: {self.stats()}")
+
+    def _refresh(self):
+        try:
+            nodes = self._fetch(self._watermark)
+        except IssueFetchError as e:
+            # Keep serving the previous snapshot rather than failing the tool call, and don't make
+            # every read wait on Linear again while it's down
+            self._stats["errors"] += 1
+            self._retry_at = time.monotonic() + self.retry_interval
+            print(f"Incremental issue refresh failed, serving stale snapshot for {self.retry_interval}s: {e}")
+            return
+        # updatedAt >= watermark always returns the boundary issues again, so only real changes
+        # move the version and invalidate views built on the snapshot
+        if self._apply(nodes):
+            self.version += 1
+        self._loaded_at = time.monotonic()
+        self._retry_at = None
+        print(f"Issue cache refresh: {self.stats()}")
+
+    def _apply(self, nodes: list[dict], advance_watermark: bool = True) -> bool:
+        """Merges nodes into the snapshot, returning True if any issue was added, changed or removed."""
+        if advance_watermark:
+            self._stats["issues_fetched"] += len(nodes)
+        changed = False
+        for node in nodes:
+            if node.get("archivedAt"):
+                changed = self._issues.pop(node["id"], None) is not None or changed
+            elif self._issues.get(node["id"]) != node:
+                self._issues[node["id"]] = node
+                changed = True
+            updated_at = node.get("updatedAt")
+            # ISO-8601 timestamps from Linear sort lexicographically
+            if advance_watermark and updated_at and (self._watermark is None or updated_at > self._watermark):
+                self._watermark = updated_at
+        return changed
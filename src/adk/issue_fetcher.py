@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .issue_cache import IssueFetchError
+from .name_email_map import NAME_EMAIL_MAP
+
+# Linear caps `first` at 250 nodes per page
+PAGE_SIZE = int(os.getenv("LINEAR_PAGE_SIZE", "250"))
+FETCH_CONCURRENCY = int(os.getenv("LINEAR_FETCH_CONCURRENCY", "4"))
+
+# --- Field projections ---
+# Callers pick a projection so titles-only lookups don't download every description
+ALL_FIELDS = ("id", "title", "description", "priority", "updatedAt", "archivedAt", "state", "assignee", "team")
+TITLE_FIELDS = ("id", "title")
+UPDATE_FIELDS = ("id", "title", "state", "team")
+LIST_FIELDS = ("id", "identifier", "title", "priority", "url", "state", "assignee")
+# Orderings Linear's PaginationOrderBy supports
+ORDER_BY = ("updatedAt", "createdAt")
+
+FIELD_SELECTIONS = {
+    "state": "state { name }",
+    "assignee": "assignee { name email }",
+    "team": "team { id name }",
+}
+
+def issue_selection(fields) -> str:
+    """Builds the GraphQL selection set for the given issue fields (id is always included)."""
+    fields = ["id"] + [f for f in fields if f != "id"]
+    return "\n".join(FIELD_SELECTIONS.get(f, f) for f in fields)
+
+def fetch_issue_page(graphql, fields=ALL_FIELDS, issue_filter: dict | None = None, include_archived: bool = False,
+                     page_size: int = PAGE_SIZE, after: str | None = None, order_by: str | None = None) -> tuple[list[dict], str | None]:
+    """
+    Fetches one page of issues. Returns (nodes, next_cursor) where next_cursor is None on the last page.
+    graphql(query, variables) must return the response's data dict or raise IssueFetchError.
+    """
+    query = f"""
+    query Issues($first: Int!, $after: String, $filter: IssueFilter, $includeArchived: Boolean, $orderBy: PaginationOrderBy) {{
+        issues(first: $first, after: $after, filter: $filter, includeArchived: $includeArchived, orderBy: $orderBy) {{
+            nodes {{
+                {issue_selection(fields)}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+    """
+    variables = {
+        "first": page_size,
+        "after": after,
+        "filter": issue_filter,
+        "includeArchived": include_archived,
+        "orderBy": order_by,
+    }
+    issues = graphql(query, variables)["issues"]
+    page_info = issues["pageInfo"]
+    return issues["nodes"], page_info["endCursor"] if page_info["hasNextPage"] else None
+
+def iter_issue_pages(graphql, fields=ALL_FIELDS, issue_filter: dict | None = None, include_archived: bool = False,
+                     page_size: int = PAGE_SIZE, order_by: str | None = None):
+    """Yields pages (lists of issue nodes) following pageInfo.endCursor until Linear reports no next page."""
+    cursor = None
+    while True:
+        nodes, cursor = fetch_issue_page(graphql, fields, issue_filter, include_archived, page_size, cursor, order_by)
+        yield nodes
+        if cursor is None:
+            return
+
+def build_issue_filter(assignee: str = "", state: str = "", priority: int | None = None, team: str = "") -> dict | None:
+    """Builds a Linear IssueFilter so filtering happens server-side instead of after a full download."""
+    issue_filter = {}
+    assignee = (assignee or "").strip()
+    if assignee.lower() == "unassigned":
+        issue_filter["assignee"] = {"null": True}
+    elif assignee:
+        email = assignee if "@" in assignee else NAME_EMAIL_MAP.get(assignee.lower())
+        if email:
+            issue_filter["assignee"] = {"email": {"eqIgnoreCase": email}}
+        else:
+            issue_filter["assignee"] = {"name": {"containsIgnoreCase": assignee}}
+    if state:
+        issue_filter["state"] = {"name": {"eqIgnoreCase": state.strip()}}
+    if priority is not None:
+        issue_filter["priority"] = {"eq": priority}
+    if team:
+        issue_filter["team"] = {"name": {"eqIgnoreCase": team.strip()}}
+    return issue_filter or None
+
+def fetch_all_nodes(graphql, connection: str, selection: str, page_size: int = PAGE_SIZE) -> list[dict]:
+    """Follows pageInfo.endCursor through a top-level Linear connection such as teams."""
+    query = f"""
+    query Nodes($first: Int!, $after: String) {{
+        {connection}(first: $first, after: $after) {{
+            nodes {{
+                {selection}
+            }}
+            pageInfo {{
+                hasNextPage
+                endCursor
+            }}
+        }}
+    }}
+    """
+    nodes, cursor = [], None
+    while True:
+        page = graphql(query, {"first": page_size, "after": cursor})[connection]
+        nodes.extend(page["nodes"])
+        if not page["pageInfo"]["hasNextPage"]:
+            return nodes
+        cursor = page["pageInfo"]["endCursor"]
+
+def list_team_ids(graphql) -> list[str]:
+    # Every team must be listed, a missing one would silently drop its issues from a full load
+    return [team["id"] for team in fetch_all_nodes(graphql, "teams", "id")]
+
+def iter_issues(graphql, fields=ALL_FIELDS, since: str | None = None, concurrency: int = 1, page_size: int = PAGE_SIZE):
+    """
+    Streams issue nodes with the given field projection.
+
+    If since is given only issues updated at or after it are returned, including archived ones
+    so callers can evict them. With concurrency > 1 the workspace is split per team and each
+    team's cursor chain is walked on its own thread; pages are yielded as they arrive.
+    """
+    base_filter = {"updatedAt": {"gte": since}} if since else {}
+    include_archived = since is not None
+
+    if concurrency <= 1:
+        for page in iter_issue_pages(graphql, fields, base_filter or None, include_archived, page_size):
+            yield from page
+        return
+
+    team_ids = list_team_ids(graphql)
+    pages = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def walk(team_id):
+        try:
+            team_filter = {**base_filter, "team": {"id": {"eq": team_id}}}
+            for page in iter_issue_pages(graphql, fields, team_filter, include_archived, page_size):
+                if stop.is_set():
+                    break
+                pages.put(page)
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(done)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, max(len(team_ids), 1))) as executor:
+        for team_id in team_ids:
+            executor.submit(walk, team_id)
+        try:
+            remaining = len(team_ids)
+            while remaining:
+                item = pages.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item if isinstance(item, IssueFetchError) else IssueFetchError(str(item))
+                else:
+                    yield from item
+        finally:
+            # Lets worker threads wind down if the consumer stops early or a page fails
+            stop.set()
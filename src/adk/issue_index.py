@@ -0,0 +1,99 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+NGRAM_SIZE = 3
+# Near-miss candidates must share this much of their trigrams with the query (Dice coefficient)
+MIN_NEAR_MISS_SCORE = 0.85
+# ...and beat the runner-up by this margin, otherwise the match is left to the caller
+MIN_NEAR_MISS_MARGIN = 0.05
+
+def normalize_title(title: str) -> str:
+    """Lowercases, strips punctuation and collapses whitespace so LLM-echoed titles compare equal."""
+    title = unicodedata.normalize("NFKC", title or "").lower()
+    title = re.sub(r"[^\w\s]|_", " ", title)
+    return " ".join(title.split())
+
+def same_identifiers(a: str, b: str) -> bool:
+    """True unless the words that differ between two titles include numbers or identifiers."""
+    differing = set(normalize_title(a).split()) ^ set(normalize_title(b).split())
+    return not any(any(char.isdigit() for char in word) for word in differing)
+
+def title_ngrams(normalized: str, n: int = NGRAM_SIZE) -> set[str]:
+    padded = f" {normalized} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class IssueIndex:
+    """
+    Lookup structure built once per issue snapshot.
+
+    Exact lookups hash the normalized title. When there is no exact hit, a trigram
+    inverted index scores titles sharing n-grams with the query so that titles that
+    are almost exact (dropped punctuation, a typo, a missing word) still resolve.
+    """
+
+    def __init__(self, issues: list[dict]):
+        self._by_title = {}
+        self._ngrams = {}
+        self._postings = defaultdict(set)
+        for issue in issues:
+            key = normalize_title(issue.get("title"))
+            if not key:
+                continue
+            # Keep the first issue for duplicate titles, matching the old next(...) scan
+            if key in self._by_title:
+                continue
+            self._by_title[key] = issue
+            grams = title_ngrams(key)
+            self._ngrams[key] = grams
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def __len__(self) -> int:
+        return len(self._by_title)
+
+    def get(self, title: str) -> dict | None:
+        """Returns the issue whose normalized title equals the given one, if any."""
+        return self._by_title.get(normalize_title(title))
+
+    def candidates(self, title: str, limit: int = 5) -> list[tuple[dict, float]]:
+        """Returns up to `limit` (issue, score) pairs ranked by trigram similarity to the title."""
+        key = normalize_title(title)
+        if not key:
+            return []
+        grams = title_ngrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] += 1
+        scored = [
+            (candidate, 2 * count / (len(grams) + len(self._ngrams[candidate])))
+            for candidate, count in shared.items()
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [(self._by_title[candidate], score) for candidate, score in scored[:limit]]
+
+    def near_miss(self, title: str, min_score: float = MIN_NEAR_MISS_SCORE, min_margin: float = MIN_NEAR_MISS_MARGIN) -> dict | None:
+        """Returns the one issue whose title is almost the given one, or None if none or several are."""
+        ranked = self.candidates(title, limit=2)
+        if not ranked or ranked[0][1] < min_score:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < min_margin:
+            return None
+        return ranked[0][0]
+
+    def resolve(self, title: str, min_score: float = MIN_NEAR_MISS_SCORE, min_margin: float = MIN_NEAR_MISS_MARGIN) -> dict | None:
+        """
+        Returns the exact match, or an unambiguous near-miss, or None. A near-miss whose differing
+        words carry digits ("phase 2" vs "phase 3", "ENG 41") names another issue and is not used.
+        """
+        issue = self.get(title)
+        if issue is not None:
+            return issue
+        issue = self.near_miss(title, min_score, min_margin)
+        if issue is None or not same_identifiers(title, issue.get("title")):
+            return None
+        return issue
@@ -0,0 +1,170 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .issue_cache import IssueFetchError
+
+BASE_URL = "https://api.linear.app/graphql"
+
+# Client-side pacing shared by every tool in the process (Linear allows ~1500 requests/hour per key)
+REQUESTS_PER_SECOND = float(os.getenv("LINEAR_REQUESTS_PER_SECOND", "5"))
+BURST = int(os.getenv("LINEAR_BURST", "10"))
+REQUEST_TIMEOUT = float(os.getenv("LINEAR_REQUEST_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("LINEAR_MAX_RETRIES", "4"))
+POOL_SIZE = int(os.getenv("LINEAR_POOL_SIZE", "10"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LinearAPIError(IssueFetchError):
+    """Raised when a Linear request fails after retries or its deadline runs out."""
+
+
+class TokenBucket:
+    """Blocking token bucket; acquire() waits until a token is available or the deadline passes."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class LinearClient:
+    """
+    Pooled GraphQL client for Linear.
+
+    One keep-alive session is shared by every caller. Each call gets an overall deadline,
+    429/5xx responses and RATELIMITED errors are retried with jittered backoff; rate-limited ones
+    also honor Retry-After and Linear's X-RateLimit-*-Reset headers, and a shared token bucket paces
+    bursts so they queue instead of tripping the server-side limit.
+    """
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL, timeout: float = REQUEST_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, rate: float = REQUESTS_PER_SECOND, burst: int = BURST,
+                 pool_size: int = POOL_SIZE):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": api_key or "",
+            "Content-Type": "application/json"
+        })
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        # Set from response headers when Linear reports an exhausted request or complexity budget
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def execute(self, query: str, variables: dict | None = None, timeout: float | None = None) -> dict:
+        """Runs a GraphQL request and returns the response body (data plus any partial errors)."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        payload = {"query": query, "variables": variables or {}}
+        attempt = 0
+        while True:
+            self._wait_for_budget(deadline)
+            remaining = deadline - time.monotonic()
+            try:
+                response = self.session.post(self.base_url, json=payload, timeout=remaining)
+            except requests.RequestException as e:
+                error, retry_after = str(e), None
+            else:
+                self._track_limits(response)
+                body = self._parse(response)
+                if response.status_code == 200 and not self._is_rate_limited(body):
+                    return body
+                if response.status_code not in RETRY_STATUS_CODES and not self._is_rate_limited(body):
+                    raise LinearAPIError(f"{response.status_code}: {response.text}")
+                error = f"{response.status_code}: {response.text}"
+                retry_after = self._retry_after(response, body, deadline)
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise LinearAPIError(f"Giving up after {attempt} attempts: {error}")
+            # Full jitter, but never earlier than the server asked for
+            delay = random.uniform(0, min(8.0, 0.5 * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise LinearAPIError(f"Deadline exceeded: {error}")
+            time.sleep(delay)
+
+    def _wait_for_budget(self, deadline: float):
+        with self._lock:
+            blocked_until = self._blocked_until
+        now = time.monotonic()
+        if blocked_until > now:
+            if blocked_until >= deadline:
+                raise LinearAPIError("Linear rate limit exhausted until after the call deadline")
+            time.sleep(blocked_until - now)
+        if not self.bucket.acquire(deadline):
+            raise LinearAPIError("Deadline exceeded waiting for client-side rate limit")
+
+    def _track_limits(self, response: requests.Response):
+        for kind in ("Requests", "Complexity"):
+            remaining = response.headers.get(f"X-RateLimit-{kind}-Remaining")
+            reset = response.headers.get(f"X-RateLimit-{kind}-Reset")
+            if remaining is not None and reset and int(float(remaining)) <= 0:
+                with self._lock:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + self._until(reset))
+
+    def _retry_after(self, response: requests.Response, body: dict, deadline: float) -> float | None:
+        """Server-requested delay for a rate-limited response; 5xx responses use the jittered backoff alone."""
+        if response.status_code != 429 and not self._is_rate_limited(body):
+            return None
+        if response.headers.get("Retry-After"):
+            try:
+                return float(response.headers["Retry-After"])
+            except ValueError:
+                pass
+        # Linear sends the reset header on every response and it marks the end of the hourly window,
+        # so it's only worth waiting for if it comes before the deadline
+        reset = response.headers.get("X-RateLimit-Requests-Reset")
+        if reset:
+            until = self._until(reset)
+            if time.monotonic() + until < deadline:
+                return until
+        return None
+
+    @staticmethod
+    def _until(reset: str) -> float:
+        """Seconds until a reset header value (epoch milliseconds)."""
+        try:
+            return max(0.0, float(reset) / 1000 - time.time())
+        except ValueError:
+            return 0.0
+
+    @staticmethod
+    def _parse(response: requests.Response) -> dict:
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def _is_rate_limited(body: dict) -> bool:
+        # Linear reports rate limiting as a GraphQL error, sometimes with a 400 status
+        return any(
+            (error.get("extensions") or {}).get("code") == "RATELIMITED"
+            for error in body.get("errors") or []
+        )
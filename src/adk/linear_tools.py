@@ -1,29 +1,35 @@
 import os
-import requests
 import json
+import base64
 import re
-import vertexai
 from google.cloud import pubsub_v1
-from vertexai.preview.generative_models import GenerativeModel
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
-from google.cloud import bigquery
 import google.auth
 from dotenv import load_dotenv
 load_dotenv()
 
 from .get_secrets import get_secret
+# Shared with the other services; ADK puts agents_dir (src/) on sys.path when it loads the agent
+import gemini_gateway
+from .issue_cache import IssueCache, IssueFetchError
+from .linear_client import LinearClient
+from .issue_index import IssueIndex, normalize_title
+from .candidate_filter import select_candidates, compact_issue, estimate_tokens
+from .llm_cache import LLMResponseCache
+from .bigquery_executor import BigQueryExecutor
+from .metrics_sql import SQLTemplateCache
+from .semantic_matcher import SemanticMatcher
+from .workflow_resolver import WorkflowResolver
+from .issue_fetcher import iter_issues, fetch_issue_page, fetch_all_nodes, build_issue_filter, ALL_FIELDS, TITLE_FIELDS, UPDATE_FIELDS, LIST_FIELDS, ORDER_BY, FETCH_CONCURRENCY
 
 PROJECT_ID = "szns-tpm-bot"
 LOCATION = "us-central1"
 SUBSCRIPTION_ID = "eng-standup-sub"
 
 LINEAR_API_KEY = os.getenv("LINEAR_API_KEY") # MAKE SURE TO CHANGE THIS IN SECRETS MANAGER
-BASE_URL = "https://api.linear.app/graphql"
 
-headers = {
-    "Authorization": LINEAR_API_KEY,
-    "Content-Type": "application/json"
-}
+# One pooled, rate-limited client shared by every Linear tool in this process
+linear_client = LinearClient(LINEAR_API_KEY)
 
 SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
 # SERVICE_ACCOUNT_FILE = os.getenv("SERVICE_ACCOUNT_FILE") # Only for local testing, remove in production
@@ -40,41 +46,70 @@ def get_credentials():
     )
     '''
 
+def _graphql_response(query: str, variables: dict | None = None) -> dict:
+    """Runs a GraphQL request against Linear and returns the full body, including any partial errors."""
+    return linear_client.execute(query, variables)
+
+def _graphql(query: str, variables: dict | None = None) -> dict:
+    """Runs a GraphQL request against Linear and returns its data, raising IssueFetchError on failure."""
+    body = _graphql_response(query, variables)
+    if body.get("errors"):
+        raise IssueFetchError(str(body["errors"]))
+    return body["data"]
+
+def fetch_issue_nodes(since: str | None = None) -> list[dict]:
+    """Fetches every issue node from Linear, only those updated at or after `since` if given."""
+    # Full loads fan out per team, incremental refreshes are small enough to walk serially
+    concurrency = FETCH_CONCURRENCY if since is None else 1
+    return list(iter_issues(_graphql, ALL_FIELDS, since=since, concurrency=concurrency))
+
+# Shared by every tool in this process so one DM doesn't trigger several full fetches
+issue_cache = IssueCache(fetch_issue_nodes)
+
 def get_issues() -> dict:
     """Fetches all Linear issues across the workspace including assignees' names and emails."""
-    query = """
-    query {
-        issues {
-            nodes {
-                id
-                title
-                description
-                state {
-                    name
-                }
-                assignee {
-                    name
-                    email
-                }
-                team {
-                    id
-                    name
-                }
-            }
+    try:
+        issues = issue_cache.get_issues()
+    except IssueFetchError as e:
+        return {
+            "status": "error",
+            "error_message": str(e)
         }
+    return {
+        "status": "success",
+        "issues": issues
     }
+
+def get_issue_records(fields) -> list[dict]:
     """
-    response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-    if response.status_code == 200:
-        return {
-            "status": "success",
-            "issues": response.json()["data"]["issues"]["nodes"]
-        }
+    Returns issues projected to `fields`. Served from the shared cache once it holds a snapshot,
+    otherwise streamed from Linear fetching only the requested fields.
+    """
+    if issue_cache.has_snapshot:
+        issues = issue_cache.get_issues()
     else:
-        return {
-            "status": "error",
-            "error_message": f"{response.status_code}: {response.text}"
-        }
+        issues = iter_issues(_graphql, fields, concurrency=FETCH_CONCURRENCY)
+    return [{field: issue.get(field) for field in fields} for issue in issues]
+
+def get_issue_index(fields=UPDATE_FIELDS) -> IssueIndex:
+    """Returns the title index for the current issue snapshot (built once per snapshot version)."""
+    if issue_cache.has_snapshot:
+        return issue_cache.view(IssueIndex)
+    return IssueIndex(get_issue_records(fields))
+
+# Vectors are kept across snapshots and only re-computed for issues that changed
+issue_matcher = SemanticMatcher()
+
+def get_issue_matcher() -> SemanticMatcher:
+    """Returns the semantic matcher synced to the current issue snapshot."""
+    issues = issue_cache.get_issues()
+    if issue_matcher.version != issue_cache.version:
+        issue_matcher.sync(issues, issue_cache.version)
+    return issue_matcher
+
+def get_issue_cache_stats() -> dict:
+    """Returns hit/miss/refresh counters for the shared Linear issue cache."""
+    return issue_cache.stats()
 
 def extract_json_block(text: str) -> list:
     # Remove markdown-style backticks
@@ -127,17 +162,26 @@ def callback(message: pubsub_v1.subscriber.message.Message):
     input_for_slack(data)
     message.ack()
 
-def compare(task_data: dict) -> dict:
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
-
-    issues_data = get_issues()
-    if issues_data is None or issues_data.get("status") != "success":
-        return {"error": "Failed to fetch Linear issues."}
-
-    linear_issues = issues_data["issues"]
-
-    prompt = f"""
+# Responses are keyed by the issue snapshot, so a repeated standup line or DM skips the model
+# until Linear changes
+llm_cache = LLMResponseCache()
+
+def generate_cached(name: str, template: str, inputs, prompt: str) -> str:
+    """Returns the model's response text for prompt, reusing a cached response for the same inputs."""
+    snapshot = issue_cache.snapshot_id
+    key = llm_cache.key(gemini_gateway.DEFAULT_MODEL, template, inputs, snapshot) if snapshot else None
+    if key:
+        cached = llm_cache.get(key, snapshot)
+        if cached is not None:
+            print(f"LLM cache hit for {name}")
+            return cached
+
+    response_text = gemini_gateway.generate_content(prompt, call_site=name).text
+    if key:
+        llm_cache.put(key, response_text, snapshot)
+    return response_text
+
+COMPARE_PROMPT = """
         You are an AI assistant at SZNS. Compare standup-reported tasks with current Linear issues.
 
         Match tasks based on their meaning (not just keywords). Only return deliverable tasks, not meetings or updates. 
@@ -145,7 +189,7 @@ def compare(task_data: dict) -> dict:
         Return a list of tasks with the following fields:
         - name: Name of the person responsible for the task (get from Standup Tasks input)
         - task: Description of the task (get from Standup Tasks input)
-        - cur_status: The current status of the *matched Linear issue*. If no Linear issue is matched, this should be null. (Get this from the 'state.name' field of the matched Linear issue in the 'Current Linear Issues' input.)
+        - cur_status: The current status of the *matched Linear issue*. If no Linear issue is matched, this should be null. (Get this from the 'state' field of the matched Linear issue in the 'Current Linear Issues' input.)
         - exp_status: The expected status given from the 'status' key in the 'Standup Task' input.
         - matched_issue_title: Title of the matched Linear issue (get from Current Linear Issues input). If no Linear issue is matched, this should be null.
 
@@ -162,174 +206,283 @@ def compare(task_data: dict) -> dict:
         
 
         Standup Task:
-        {json.dumps(task_data, indent=2)}
+        {task}
 
         Current Linear Issues:
-        {json.dumps(linear_issues, indent=2)}
+        {issues}
     """
-    response = model.generate_content(prompt)
-    return response.text
 
-def get_state_id_by_name(state_name: str) -> str:
-    """Fetches the ID of a Linear workflow state by its name."""
-    query = """
-    query {
-        workflowStates {
-            nodes {
-                id
-                name
-            }
-        }
-    }
-    """
-    response = requests.post(BASE_URL, json={"query": query}, headers=headers)
-    if response.status_code == 200:
-        states = response.json().get("data", {}).get("workflowStates", {}).get("nodes", [])
-        for state in states:
-            if state["name"].strip().lower() == state_name.strip().lower():
-                return state["id"]
-    return None
+def _local_comparison(task_data: dict, issue: dict | None) -> str:
+    """Builds compare()'s output for a match the local matcher is confident about."""
+    return json.dumps([{
+        "name": task_data.get("name"),
+        "task": task_data.get("task"),
+        "cur_status": (issue.get("state") or {}).get("name") if issue else None,
+        "exp_status": task_data.get("status"),
+        "matched_issue_title": issue["title"] if issue else None
+    }], indent=2)
+
+def _issues_tokens(issues: list[dict]) -> int:
+    """Token estimate for sending every issue, computed once per snapshot version for logging."""
+    return estimate_tokens(json.dumps(issues, indent=2))
+
+def compare(task_data: dict) -> dict:
+    issues_data = get_issues()
+    if issues_data is None or issues_data.get("status") != "success":
+        return {"error": "Failed to fetch Linear issues."}
+
+    linear_issues = issues_data["issues"]
+
+    # Only ask Gemini when the local matcher can't tell the candidates apart
+    match = get_issue_matcher().best_match(task_data.get("task", ""))
+    if match["confident"]:
+        return _local_comparison(task_data, match["issue"])
+
+    # Send only the most relevant issues, in compact form, instead of the whole workspace
+    candidates = select_candidates(task_data, linear_issues)
+    task = json.dumps(task_data, indent=2)
+    prompt = COMPARE_PROMPT.format(task=task, issues=json.dumps([compact_issue(issue) for issue in candidates], indent=2))
+    full_prompt_tokens = estimate_tokens(COMPARE_PROMPT) + estimate_tokens(task) + issue_cache.view(_issues_tokens)
+    print(f"compare prompt tokens: {full_prompt_tokens} -> {estimate_tokens(prompt)} ({len(candidates)} of {len(linear_issues)} issues)")
+
+    return generate_cached("compare", COMPARE_PROMPT, task_data, prompt)
+
+def _fetch_all_nodes(connection: str, selection: str) -> list[dict]:
+    return fetch_all_nodes(_graphql, connection, selection)
+
+def load_teams_and_states() -> tuple[list[dict], list[dict]]:
+    teams = _fetch_all_nodes("teams", "id name")
+    states = _fetch_all_nodes("workflowStates", "id name team { id }")
+    return teams, states
+
+# Teams and workflow states rarely change, so they're loaded once and reloaded on TTL or miss
+workflow_resolver = WorkflowResolver(load_teams_and_states)
+
+def get_state_id_by_name(state_name: str, team_id: str | None = None) -> str:
+    """Returns the ID of a Linear workflow state by its name, scoped to the given team if provided."""
+    try:
+        return workflow_resolver.state_id(state_name, team_id)
+    except IssueFetchError as e:
+        print(f"Failed to load Linear workflow states: {e}")
+        return None
 
 def get_team_id_by_name(team_name: str) -> str:
-    """Fetches the ID of a Linear team by its name."""
-    query = """
-    query {
-        teams {
-            nodes {
-                id
-                name
-            }
-        }
-    }
-    """
-    response = requests.post(BASE_URL, json={"query": query}, headers=headers)
+    """Returns the ID of a Linear team by its name."""
+    try:
+        return workflow_resolver.team_id(team_name)
+    except IssueFetchError as e:
+        print(f"Failed to load Linear teams: {e}")
+        return None
 
-    if response.status_code == 200:
-        teams = response.json().get("data", {}).get("teams", {}).get("nodes", [])
-        for team in teams:
-            if team["name"].strip().lower() == team_name.strip().lower():
-                return team["id"]
-    return None
+# Aliased issueUpdate mutations per request, kept small to stay under Linear's complexity limit
+BATCH_SIZE = int(os.getenv("LINEAR_BATCH_SIZE", "20"))
 
-def update_linear_issue(task_data: dict) -> dict:
-    # get issue ID from title
-    issues = get_issues()["issues"] 
-    matched_issue = next((issue for issue in issues if issue["title"].strip().lower() == task_data["title"].strip().lower()), None)
+def _prepare_update(index: IssueIndex, task_data: dict) -> dict:
+    """Resolves one {title, status} / {title, priority} update to an issueUpdate input or an error result."""
+    # Writes only go to the issue the caller named; a near-miss is offered back for confirmation
+    matched_issue = index.get(task_data.get("title", ""))
     if not matched_issue:
-        return {"status": "error", "message": "No matching issue found in Linear."}
-    
-    state_id = get_state_id_by_name(task_data.get("status", ""))
-    if not state_id:
-        return {"status": "error", "message": "No matching status found in Linear."}
-    
-    team_id = matched_issue.get("team", {}).get("id")
-    if not team_id:
-        return {"status": "error", "message": "No team ID found for the matched issue."}
-
-    # Update the status of the matched Linear issue
-    mutation = """
-    mutation UpdateIssue($id: String!, $input: IssueUpdateInput!) {
-        issueUpdate(id: $id, input: $input) {
+        candidate = index.near_miss(task_data.get("title", ""))
+        if candidate:
+            return {"error": {
+                "status": "error",
+                "message": f"No issue titled '{task_data.get('title', '')}' in Linear. Did you mean '{candidate['title']}'? Confirm and retry with that exact title.",
+                "candidate": candidate["title"],
+            }}
+        return {"error": {"status": "error", "message": "No matching issue found in Linear."}}
+
+    update_input = {}
+    if "priority" in task_data:
+        priority = task_data.get("priority")
+        if priority not in [0, 1, 2, 3, 4]:
+            return {"error": {"status": "error", "message": f"Invalid priority level: {priority}"}}
+        update_input["priority"] = priority
+
+    if task_data.get("status") or "priority" not in task_data:
+        team_id = (matched_issue.get("team") or {}).get("id")
+        if not team_id:
+            return {"error": {"status": "error", "message": "No team ID found for the matched issue."}}
+
+        # State names repeat across teams, so resolve the one belonging to the issue's team
+        state_id = get_state_id_by_name(task_data.get("status", ""), team_id)
+        if not state_id:
+            return {"error": {"status": "error", "message": "No matching status found in Linear."}}
+        update_input["stateId"] = state_id
+        update_input["teamId"] = team_id
+
+    return {"id": matched_issue["id"], "input": update_input}
+
+def _update_message(task_data: dict, issue: dict) -> str:
+    if task_data.get("status"):
+        return f"Issue '{issue['title']}' updated to status '{task_data['status']}'"
+    return f"Issue '{issue['title']}' updated to priority {issue['priority']}"
+
+def _send_update_batch(chunk: list[tuple[int, dict, dict]], results: list):
+    """Sends one aliased mutation document for a chunk of (position, task_data, prepared) updates."""
+    params, fields, variables = [], [], {}
+    for n, (_, _, prepared) in enumerate(chunk):
+        params.append(f"$id{n}: String!, $input{n}: IssueUpdateInput!")
+        fields.append(f"""
+        u{n}: issueUpdate(id: $id{n}, input: $input{n}) {{
             success
-            issue {
+            issue {{
                 id
                 title
-                state {
+                priority
+                state {{
                     name
-                }
-            }
-        }
-    }
-    """
-    
-    variables = {
-        "id": matched_issue["id"],
-        "input": {
-            "stateId": state_id,
-            "teamId": team_id, 
-        }
-    }
+                }}
+            }}
+        }}""")
+        variables[f"id{n}"] = prepared["id"]
+        variables[f"input{n}"] = prepared["input"]
+    mutation = f"mutation BatchUpdateIssues({', '.join(params)}) {{{''.join(fields)}\n    }}"
 
-    response = requests.post(BASE_URL, json={"query": mutation, "variables": variables}, headers=headers, timeout=15)
-    if response.status_code == 200:
-        result = response.json().get("data", {}).get("issueUpdate", {})
-        if result.get("success"):
-            return {
-                "status": "success",
-                "message": f"Issue '{result['issue']['title']}' updated to status '{task_data['status']}'"
-            }
+    try:
+        body = _graphql_response(mutation, variables)
+    except IssueFetchError as e:
+        for position, _, _ in chunk:
+            results[position] = {"status": "error", "message": f"Error {e}"}
+        return
+
+    data = body.get("data") or {}
+    # Errors on one alias don't fail the others, map them back by their path
+    errors = {}
+    # Errors without a path (validation, complexity limits) failed the whole document
+    document_errors = []
+    for error in body.get("errors") or []:
+        path = error.get("path") or []
+        if path:
+            errors[path[0]] = error.get("message", "Unknown error")
         else:
-            return {"status": "error", "message": "Failed to update issue."}
+            document_errors.append(error.get("message", "Unknown error"))
 
+    for n, (position, task_data, _) in enumerate(chunk):
+        result = data.get(f"u{n}") or {}
+        if result.get("success"):
+            results[position] = {"status": "success", "message": _update_message(task_data, result["issue"])}
+        elif f"u{n}" in errors:
+            results[position] = {"status": "error", "message": errors[f"u{n}"]}
+        elif document_errors:
+            results[position] = {"status": "error", "message": "; ".join(document_errors)}
+        else:
+            message = "Failed to update issue." if task_data.get("status") else "Failed to update priority."
+            results[position] = {"status": "error", "message": message}
 
-def update_linear_priority(task_data: dict) -> dict:
+def update_linear_issues_batch(updates: list[dict]) -> list[dict]:
     """
-    Update the priority of a Linear issue based on its title.
-    task_data = {
-        "title": "<title of the issue>",
-        "priority": 1  # integer between 0 and 4
-    }
+    Updates many Linear issues in as few requests as possible.
+    updates = [
+        {"title": "<title of the issue>", "status": "<new status>"},
+        {"title": "<title of the issue>", "priority": 1}  # integer between 0 and 4
+    ]
+    Returns one {"status", "message"} result per update, in the same order.
     """
-    issues = get_issues().get("issues", [])
-    matched_issue = next((issue for issue in issues if issue["title"].strip().lower() == task_data["title"].strip().lower()), None)
-    
-    if not matched_issue:
-        return {"status": "error", "message": "No matching issue found in Linear."}
+    try:
+        index = get_issue_index(UPDATE_FIELDS)
+    except IssueFetchError as e:
+        return [{"status": "error", "message": f"Failed to fetch Linear issues: {e}"} for _ in updates]
+
+    results = [None] * len(updates)
+    pending = []
+    for position, task_data in enumerate(updates):
+        prepared = _prepare_update(index, task_data)
+        if "error" in prepared:
+            results[position] = prepared["error"]
+        else:
+            pending.append((position, task_data, prepared))
 
-    priority = task_data.get("priority")
-    if priority not in [0, 1, 2, 3, 4]:
-        return {"status": "error", "message": f"Invalid priority level: {priority}"}
+    for start in range(0, len(pending), BATCH_SIZE):
+        _send_update_batch(pending[start:start + BATCH_SIZE], results)
 
-    mutation = """
-    mutation UpdateIssue($id: String!, $input: IssueUpdateInput!) {
-        issueUpdate(id: $id, input: $input) {
-            success
-            issue {
+    if pending:
+        issue_cache.expire()
+    return results
+
+def lookup_issue_for_update(title: str) -> dict | None:
+    """
+    Fetches the issue with the given title together with its team's workflow states in a
+    single request. Returns None if Linear has no case-insensitive exact match.
+    """
+    query = """
+    query IssueForUpdate($title: String!) {
+        issues(first: 1, filter: { title: { eqIgnoreCase: $title } }) {
+            nodes {
                 id
                 title
-                priority
+                team {
+                    id
+                    name
+                    states {
+                        nodes {
+                            id
+                            name
+                        }
+                    }
+                }
             }
         }
     }
     """
+    nodes = _graphql(query, {"title": title.strip()})["issues"]["nodes"]
+    return nodes[0] if nodes else None
 
-    variables = {
-        "id": matched_issue["id"],
-        "input": {
-            "priority": priority
-        }
-    }
+def _update_issue_status_direct(task_data: dict) -> dict | None:
+    """Status update costing one lookup plus the mutation, or None if the title needs fuzzy resolution."""
+    matched_issue = lookup_issue_for_update(task_data["title"])
+    if not matched_issue:
+        return None
 
-    response = requests.post(BASE_URL, json={"query": mutation, "variables": variables}, headers=headers)
-    
-    if response.status_code == 200:
-        result = response.json().get("data", {}).get("issueUpdate", {})
-        if result.get("success"):
-            return {
-                "status": "success",
-                "message": f"Issue '{result['issue']['title']}' updated to priority {result['issue']['priority']}"
-            }
-        else:
-            return {"status": "error", "message": "Failed to update priority."}
-    else:
-        return {"status": "error", "message": f"Error {response.status_code}: {response.text}"}
+    team = matched_issue.get("team") or {}
+    if not team.get("id"):
+        return {"status": "error", "message": "No team ID found for the matched issue."}
+    states = team.get("states", {}).get("nodes", [])
+    workflow_resolver.add_team_states(team["id"], states)
 
-def match_issue(task_title: str) -> str:
+    status = normalize_title(task_data.get("status", ""))
+    state_id = next((state["id"] for state in states if normalize_title(state["name"]) == status), None)
+    if not state_id:
+        return {"status": "error", "message": "No matching status found in Linear."}
+
+    prepared = {"id": matched_issue["id"], "input": {"stateId": state_id, "teamId": team["id"]}}
+    results = [None]
+    _send_update_batch([(0, task_data, prepared)], results)
+    issue_cache.expire()
+    return results[0]
+
+def update_linear_issue(task_data: dict) -> dict:
     """
-    Uses Gemini to find the most semantically similar Linear issue to the given task_title.
-    Returns the matched issue object or None.
+    Update the status of a Linear issue based on its title.
+    task_data = {
+        "title": "<title of the issue>",
+        "status": "<new status>"
+    }
     """
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
+    task_data = {"title": task_data["title"], "status": task_data.get("status", "")}
+    # Without a fresh snapshot, one composite query beats reloading issues and states separately.
+    # With one, an issue created since the snapshot was taken is only found by asking Linear.
+    try:
+        indexed = issue_cache.is_fresh() and get_issue_index(UPDATE_FIELDS).get(task_data["title"]) is not None
+        if not indexed:
+            result = _update_issue_status_direct(task_data)
+            if result is not None:
+                return result
+    except IssueFetchError as e:
+        return {"status": "error", "message": f"Failed to fetch Linear issue: {e}"}
+    return update_linear_issues_batch([task_data])[0]
 
-    # Get all Linear issues
-    issues_data = get_issues()
-    if not issues_data or issues_data.get("status") != "success":
-        return None
 
-    issues = issues_data["issues"]
+def update_linear_priority(task_data: dict) -> dict:
+    """
+    Update the priority of a Linear issue based on its title.
+    task_data = {
+        "title": "<title of the issue>",
+        "priority": 1  # integer between 0 and 4
+    }
+    """
+    return update_linear_issues_batch([{"title": task_data["title"], "priority": task_data.get("priority")}])[0]
 
-    prompt = f"""
+MATCH_ISSUE_PROMPT = """
         You are a task matching assistant.
 
         Given the task: "{task_title}"
@@ -339,24 +492,32 @@ def match_issue(task_title: str) -> str:
         Respond ONLY with the exact title of the best-matched issue.
 
         Issues:
-        {json.dumps([issue["title"] for issue in issues], indent=2)}
+        {issues}
     """
 
-    response = model.generate_content(prompt)
-    best_match_title = response.text.strip().strip('"')
-
-    return best_match_title
-
-def handle_dm_update(text: str) -> dict:
+def match_issue(task_title: str) -> str:
     """
-    Parses a natural language DM to extract task title and new status,
-    then updates the issue in Linear.
+    Finds the most semantically similar Linear issue to the given task_title, using the local
+    matcher and only asking Gemini when the match is ambiguous.
+    Returns the matched issue title or None.
     """
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
-    issues = get_issues().get("issues", [])
+    try:
+        matcher = get_issue_matcher()
+    except IssueFetchError:
+        return None
 
-    prompt = f"""
+    match = matcher.best_match(task_title)
+    if match["confident"] and match["issue"]:
+        return match["issue"]["title"]
+
+    issues = issue_cache.get_issues()
+    prompt = MATCH_ISSUE_PROMPT.format(task_title=task_title, issues=json.dumps([issue["title"] for issue in issues], indent=2))
+    response_text = generate_cached("match_issue", MATCH_ISSUE_PROMPT, {"task_title": task_title}, prompt)
+    best_match_title = response_text.strip().strip('"')
+
+    return best_match_title
+
+HANDLE_DM_PROMPT = """
         You are a task update assistant. Given a message from Slack, extract:
         - title: the exact title of the Linear issue to update
         - status: the new status to set
@@ -368,77 +529,122 @@ def handle_dm_update(text: str) -> dict:
         \"{text}\"
 
         Existing Linear issues:
-        {json.dumps([issue["title"] for issue in issues], indent=2)}
+        {issues}
+    """
+
+def handle_dm_update(text: str) -> dict:
+    """
+    Parses a natural language DM to extract task title and new status,
+    then updates the issue in Linear.
     """
+    try:
+        issues = get_issue_records(TITLE_FIELDS)
+    except IssueFetchError:
+        issues = []
 
-    response = model.generate_content(prompt)
-    response = extract_json_block(response.text.strip())
+    prompt = HANDLE_DM_PROMPT.format(text=text, issues=json.dumps([issue["title"] for issue in issues], indent=2))
+    response_text = generate_cached("handle_dm_update", HANDLE_DM_PROMPT, {"text": text}, prompt)
+    response = extract_json_block(response_text.strip())
 
     try:
         return update_linear_issue(response)
     except Exception as e:
-        return {"status": "error", "message": f"Gemini failed to parse task: {e}\nRaw: {response.text}"}
+        return {"status": "error", "message": f"Gemini failed to parse task: {e}\nRaw: {response_text}"}
 
 def format_issue_list(issues: list[dict]) -> str:
-    max_issues = 15
-    displayed = issues[:max_issues]
+    max_issues = 50
+    continuation = next((issue for issue in issues if issue.get("next_cursor")), None)
+    listed = [issue for issue in issues if not issue.get("next_cursor")]
+    displayed = listed[:max_issues]
     lines = [
         f"- *{issue['title']}* ({issue['status']}) – {issue['assignee']} [Priority: {issue['priority']}]"
         for issue in displayed
     ]
-    if len(issues) > max_issues:
+    if continuation:
+        # Each DM starts a fresh ADK session, so the cursor has to travel in the reply itself
+        lines.append(f"…and more. For the next page, reply with: `next page cursor: {continuation['next_cursor']}`")
+    elif len(listed) > max_issues:
         lines.append("…and more.")
     return "\n".join(lines)
 
 
-def list_linear_issues() -> list[dict]:
+def list_linear_issues(assignee: str = "", state: str = "", priority: int = -1, team: str = "",
+                       order_by: str = "updatedAt", cursor: str = "", limit: int = 15) -> str:
     """
-    Returns a list of Linear issues with metadata:
-    title, status, assignee, priority (0-4), and issue link.
+    Returns a page of Linear issues as Slack-formatted text, one line per issue with
+    title, status, assignee and priority (0-4).
+    Optional filters: assignee (name or email, or "unassigned"), state (e.g. "In Progress"),
+    priority (0= No priority, 1= Urgent, 2= High, 3= Medium, 4= Low, -1 for any), team (team name).
+    order_by is "updatedAt" or "createdAt" (most recent first).
+    If there are more results, the last line holds a cursor; when the user replies with
+    "next page cursor: <cursor>", pass <cursor> as cursor to get the next page (it remembers the filters).
     """
-    issues_data = get_issues()
-    if issues_data.get("status") != "success":
-        return []
+    if cursor:
+        # Page tokens carry the filters too, since the follow-up DM runs in a fresh session
+        try:
+            page = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            assignee, state, priority, team, order_by, limit, cursor = (
+                page["assignee"], page["state"], page["priority"], page["team"], page["order_by"], page["limit"], page["after"]
+            )
+        except (ValueError, KeyError, TypeError):
+            pass
+    issue_filter = build_issue_filter(assignee, state, priority if priority in [0, 1, 2, 3, 4] else None, team)
+    try:
+        issues, next_cursor = fetch_issue_page(
+            _graphql,
+            LIST_FIELDS,
+            issue_filter,
+            page_size=max(1, min(limit, 50)),
+            after=cursor or None,
+            order_by=order_by if order_by in ORDER_BY else "updatedAt"
+        )
+    except IssueFetchError as e:
+        print(f"Failed to list Linear issues: {e}")
+        return "Failed to list Linear issues."
 
-    issues = issues_data["issues"]
     issue_list = []
-    for issue in issues[:15]:
+    for issue in issues:
         issue_list.append({
             "title": issue["title"],
             "status": issue["state"]["name"] if issue.get("state") else None,
             "assignee": issue["assignee"]["name"] if issue.get("assignee") else "Unassigned",
             "priority": issue.get("priority", "N/A"),
-            "url": f"https://linear.app/issue/{issue['id']}"
+            "url": issue.get("url") or f"https://linear.app/issue/{issue['identifier']}"
         })
 
-    if len(issues) > 15:
+    if next_cursor:
         issue_list.append({
             "title": "...and more",
             "status": None,
             "assignee": None,
             "priority": None,
-            "url": None
+            "url": None,
+            "next_cursor": base64.urlsafe_b64encode(json.dumps({
+                "assignee": assignee, "state": state, "priority": priority, "team": team,
+                "order_by": order_by, "limit": limit, "after": next_cursor
+            }).encode("utf-8")).decode("ascii")
         })
 
-    return issue_list
+    return format_issue_list(issue_list) or "No matching issues found."
+
+# Generated SQL normalized into templates keyed by question shape
+sql_templates = SQLTemplateCache()
+
+# Reuses one client, guards bytes scanned and caches results until the next snapshot load
+bigquery_executor = BigQueryExecutor(get_credentials, PROJECT_ID)
 
 def run_bigquery_query(query: str) -> dict:
-    try:
-        credentials = get_credentials()
-        client = bigquery.Client(credentials=credentials, project=PROJECT_ID)
-        query_job = client.query(query)
-        rows = query_job.result()
-        return {"status": "success", "rows": [dict(row) for row in rows]}
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    return bigquery_executor.run(query)
 
 def handle_metrics(text: str) -> dict:
     """
     Returns metrics data from BQ by translating natural language to SQL query 
     """
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
-    issues = get_issues().get("issues", [])
+    # Most questions differ only in owner/status/time window, so reuse SQL learned for the same shape
+    sql_query = sql_templates.lookup(text)
+    if sql_query is not None:
+        print(f"SQL template cache hit: {sql_query}")
+        return run_bigquery_query(sql_query)
 
     prompt = f"""
         You are a BigQuery SQL query generator assistant for the 'szns-tpm-bot' system. Your goal is to convert user requests received from Slack messages into valid and efficient BigQuery SQL queries.
@@ -508,9 +714,13 @@ def handle_metrics(text: str) -> dict:
         \"{text}\"
     """
 
-    response = model.generate_content(prompt)
+    response = gemini_gateway.generate_content(prompt, call_site="handle_metrics")
     sql_query = response.text.strip()
     sql_query = re.sub(r"```sql|```", "", sql_query).strip()
+    if sql_query == "INVALID_QUERY":
+        return {"status": "error", "message": "This question can't be answered from the Linear metrics tables."}
+
+    sql_templates.learn(text, sql_query)
     result = run_bigquery_query(sql_query)
     return result
 
@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+LINEAR_WEBHOOK_SECRET = os.getenv("LINEAR_WEBHOOK_SECRET")
+# Deliveries older than this are rejected as possible replays
+MAX_WEBHOOK_AGE = float(os.getenv("LINEAR_WEBHOOK_MAX_AGE", "60"))
+
+def verify_signature(raw_body: bytes, signature: str | None, secret: str | None = LINEAR_WEBHOOK_SECRET) -> bool:
+    """Checks the Linear-Signature header, an HMAC-SHA256 hex digest of the raw body."""
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), raw_body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+def is_recent(payload: dict, max_age: float = MAX_WEBHOOK_AGE) -> bool:
+    timestamp = payload.get("webhookTimestamp")
+    if timestamp is None:
+        return False
+    return abs(time.time() - timestamp / 1000) <= max_age
+
+def issue_node(data: dict, existing: dict | None = None) -> dict:
+    """Maps an Issue webhook's data onto the node shape used by the issue cache."""
+    node = dict(existing or {})
+    for field in ("id", "title", "description", "priority", "updatedAt", "archivedAt"):
+        if field in data:
+            node[field] = data[field]
+    if data.get("state"):
+        node["state"] = {"name": data["state"].get("name")}
+    if data.get("team"):
+        node["team"] = {"id": data["team"].get("id"), "name": data["team"].get("name")}
+    if "assignee" in data or "assigneeId" in data:
+        assignee = data.get("assignee")
+        if assignee:
+            # Webhook payloads may omit the email, keep the one we already have for the same person
+            previous = (existing or {}).get("assignee") or {}
+            email = assignee.get("email") or (previous.get("email") if previous.get("name") == assignee.get("name") else None)
+            node["assignee"] = {"name": assignee.get("name"), "email": email}
+        else:
+            node["assignee"] = None
+    return node
+
+def apply_event(payload: dict, cache, resolver) -> bool:
+    """
+    Applies an Issue or WorkflowState create/update/remove event to the issue cache and the
+    workflow resolver. Returns True if anything was applied.
+    """
+    action = payload.get("action")
+    kind = payload.get("type")
+    data = payload.get("data") or {}
+    if not data.get("id"):
+        return False
+
+    if kind == "Issue":
+        if action == "remove":
+            removed_at = datetime.now(timezone.utc).isoformat()
+            return cache.apply_changes([{"id": data["id"], "archivedAt": data.get("archivedAt") or removed_at}])
+        return cache.apply_changes([issue_node(data, cache.get_issue(data["id"]))])
+
+    if kind == "WorkflowState":
+        # Drop the old entry first so a renamed state doesn't stay reachable under its old name
+        resolver.remove_state(data["id"])
+        if action != "remove":
+            team_id = data.get("teamId") or (data.get("team") or {}).get("id")
+            resolver.add_team_states(team_id, [{"id": data["id"], "name": data.get("name", "")}])
+        return True
+
+    return False
+
+def handle_webhook(raw_body: bytes, signature: str | None, cache, resolver, secret: str | None = LINEAR_WEBHOOK_SECRET) -> tuple[str, int]:
+    """Verifies and applies one webhook delivery, returning a (body, status) pair for the HTTP response."""
+    if not verify_signature(raw_body, signature, secret):
+        return "Invalid signature", 401
+    try:
+        payload = json.loads(raw_body)
+    except ValueError:
+        return "Bad request: invalid JSON", 400
+    if not is_recent(payload):
+        return "Stale webhook", 401
+    applied = apply_event(payload, cache, resolver)
+    return ("OK" if applied else "Ignored"), 200
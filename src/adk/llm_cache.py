@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+# Optional directory so responses survive restarts, unset keeps the cache in memory only
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR")
+
+def normalize_input(value):
+    """Case/whitespace-insensitive form of prompt inputs so repeated standup lines hash the same."""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFKC", value).lower().split())
+    if isinstance(value, dict):
+        return {key: normalize_input(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [normalize_input(item) for item in value]
+    return value
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of model responses.
+
+    Keys hash (model, prompt template, normalized inputs, issue snapshot id), so a response is
+    only reused while Linear looks the same as when it was generated. Entries from older
+    snapshots are dropped as soon as a new snapshot id is seen. Memory is bounded by LRU
+    eviction; when a directory is given entries are also written there as JSON files.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_SIZE, directory: str | None = LLM_CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, template: str, inputs, snapshot) -> str:
+        payload = json.dumps([
+            model,
+            hashlib.sha256(template.encode("utf-8")).hexdigest(),
+            normalize_input(inputs),
+            snapshot
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, snapshot) -> str | None:
+        with self._lock:
+            self._roll_snapshot(snapshot)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key]
+        value = self._read_disk(key, snapshot)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: str, snapshot):
+        with self._lock:
+            self._roll_snapshot(snapshot)
+            self._remember(key, value)
+        self._write_disk(key, value, snapshot)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+    def _remember(self, key: str, value: str):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _roll_snapshot(self, snapshot):
+        if snapshot == self._snapshot:
+            return
+        # Every key embeds the snapshot id, so nothing cached before it can be hit again
+        self._snapshot = snapshot
+        self._entries.clear()
+        self._prune_disk(snapshot)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str, snapshot) -> str | None:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry["value"] if entry.get("snapshot") == snapshot else None
+
+    def _write_disk(self, key: str, value: str, snapshot):
+        if not self.directory:
+            return
+        try:
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"snapshot": snapshot, "value": value}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Failed to write LLM cache entry: {e}")
+
+    def _prune_disk(self, snapshot):
+        if not self.directory:
+            return
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "r") as f:
+                    stale = json.load(f).get("snapshot") != snapshot
+            except (OSError, ValueError):
+                stale = True
+            if stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
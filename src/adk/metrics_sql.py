@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import threading
+
+from .name_email_map import NAME_EMAIL_MAP
+
+# Optional JSON file so learned templates survive restarts
+METRICS_SQL_CACHE_PATH = os.getenv("METRICS_SQL_CACHE_PATH")
+
+STATUSES = {
+    "todo": "Todo",
+    "to do": "Todo",
+    "in progress": "In Progress",
+    "in review": "In Review",
+    "done": "Done",
+    "backlog": "Backlog",
+    "canceled": "Canceled",
+    "cancelled": "Canceled",
+}
+
+WINDOW_UNITS = {"day": 1, "week": 7, "month": 30}
+FIXED_WINDOWS = {"today": 1, "this week": 7, "past week": 7, "last week": 7, "this month": 30, "last month": 30}
+FILLER_WORDS = {"please", "the", "a", "an", "can", "could", "you", "me"}
+
+def _names_pattern() -> re.Pattern:
+    # Full names first so "nathan kim" wins over "nathan"
+    names = set(NAME_EMAIL_MAP)
+    names |= {name.split(" ")[0] for name in NAME_EMAIL_MAP}
+    alternatives = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return re.compile(rf"\b({alternatives})\b", re.IGNORECASE)
+
+OWNER_PATTERN = _names_pattern()
+STATUS_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(s) for s in sorted(STATUSES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+WINDOW_PATTERN = re.compile(
+    r"\b(?:(?:last|past)\s+(\d+)\s+(day|week|month)s?|("
+    + "|".join(re.escape(w) for w in sorted(FIXED_WINDOWS, key=len, reverse=True)) + r"))\b",
+    re.IGNORECASE
+)
+
+def extract_slots(question: str) -> list[dict]:
+    """
+    Finds owner names, statuses and time windows in a metrics question.
+    Each slot is {"name", "value", "start", "end"}; time windows are returned in days.
+    """
+    slots = []
+    for match in OWNER_PATTERN.finditer(question):
+        # Title-cased like Linear display names, since BigQuery string comparison is case-sensitive
+        slots.append({"name": "owner", "value": match.group(1).title(), "start": match.start(), "end": match.end()})
+    for match in STATUS_PATTERN.finditer(question):
+        slots.append({"name": "status", "value": STATUSES[match.group(1).lower()], "start": match.start(), "end": match.end()})
+    for match in WINDOW_PATTERN.finditer(question):
+        if match.group(1):
+            days = int(match.group(1)) * WINDOW_UNITS[match.group(2).lower()]
+        else:
+            days = FIXED_WINDOWS[match.group(3).lower()]
+        slots.append({"name": "days", "value": days, "start": match.start(), "end": match.end()})
+    slots.sort(key=lambda slot: slot["start"])
+    # Overlapping matches (e.g. "last week" vs a status) keep the earliest one
+    kept = []
+    for slot in slots:
+        if kept and slot["start"] < kept[-1]["end"]:
+            continue
+        kept.append(slot)
+    for n, slot in enumerate(kept):
+        slot["placeholder"] = f"{slot['name']}{n}"
+    return kept
+
+def question_shape(question: str, slots: list[dict]) -> str:
+    """The question with slot values replaced by placeholders and filler words dropped."""
+    parts, cursor = [], 0
+    for slot in slots:
+        parts.append(question[cursor:slot["start"]])
+        parts.append(f" {{{slot['placeholder']}}} ")
+        cursor = slot["end"]
+    parts.append(question[cursor:])
+    words = re.sub(r"[^\w{}\s]", " ", "".join(parts).lower()).split()
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+def _literal_pattern(slot: dict) -> re.Pattern:
+    if slot["name"] == "days":
+        return re.compile(rf"\bINTERVAL\s+{slot['value']}\s+DAY\b", re.IGNORECASE)
+    # The value inside a string literal, optionally wrapped in LIKE wildcards
+    return re.compile(rf"'(%?){re.escape(str(slot['value']))}(%?)'", re.IGNORECASE)
+
+def _sql_literal(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("'", "\\'")
+
+
+class SQLTemplateCache:
+    """
+    Parameterized SQL learned from previous metrics questions.
+
+    learn() replaces each slot value found in the question with a placeholder in the generated
+    SQL and stores it under the question's shape. lookup() fills a stored template with the
+    slots of a new question of the same shape, so "tasks in progress for Nathan" can answer
+    "tasks in review for Dan" without calling the model.
+    """
+
+    def __init__(self, path: str | None = METRICS_SQL_CACHE_PATH):
+        self.path = path
+        self._templates = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "learned": 0}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self._templates = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Failed to load SQL template cache: {e}")
+
+    def lookup(self, question: str) -> str | None:
+        slots = extract_slots(question)
+        shape = question_shape(question, slots)
+        with self._lock:
+            template = self._templates.get(shape)
+            if template is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+        sql = template
+        for slot in slots:
+            if slot["name"] == "days":
+                sql = sql.replace(f"{{{slot['placeholder']}}}", f"INTERVAL {int(slot['value'])} DAY")
+            else:
+                sql = sql.replace(f"{{{slot['placeholder']}}}", _sql_literal(slot["value"]))
+        return sql
+
+    def learn(self, question: str, sql: str) -> bool:
+        """Stores sql as a template for the question's shape; returns False if it can't be parameterized."""
+        slots = extract_slots(question)
+        template = sql
+        for slot in slots:
+            pattern = _literal_pattern(slot)
+            if not pattern.search(template):
+                # A slot the SQL doesn't use verbatim would be silently ignored for other values
+                return False
+            if slot["name"] == "days":
+                template = pattern.sub(f"{{{slot['placeholder']}}}", template)
+            else:
+                template = pattern.sub(lambda m: f"'{m.group(1)}{{{slot['placeholder']}}}{m.group(2)}'", template)
+        with self._lock:
+            self._templates[question_shape(question, slots)] = template
+            self._stats["learned"] += 1
+            self._save()
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "templates": len(self._templates)}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self._templates, f, indent=2)
+        except OSError as e:
+            print(f"Failed to save SQL template cache: {e}")
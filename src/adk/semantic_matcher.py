@@ -0,0 +1,144 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from .issue_index import normalize_title
+
+VECTOR_DIM = int(os.getenv("MATCHER_VECTOR_DIM", "2048"))
+DESCRIPTION_WEIGHT = 0.3
+MAX_DESCRIPTION_CHARS = 500
+
+# A match is taken without the LLM when it scores at least this and beats the runner-up by the margin
+CONFIDENT_SCORE = float(os.getenv("MATCHER_CONFIDENT_SCORE", "0.55"))
+CONFIDENT_MARGIN = float(os.getenv("MATCHER_CONFIDENT_MARGIN", "0.15"))
+# Below this nothing shares enough vocabulary with the task to count as a match
+NO_MATCH_SCORE = float(os.getenv("MATCHER_NO_MATCH_SCORE", "0.1"))
+
+STOPWORDS = {
+    "a", "an", "and", "the", "to", "of", "for", "in", "on", "with", "at", "by", "from", "is",
+    "it", "be", "as", "or", "up", "into", "that", "this", "my", "our", "work", "working",
+}
+
+def _features(text: str) -> list[str]:
+    """Word unigrams and bigrams plus per-word character trigrams, so 'building' still overlaps 'build'."""
+    words = [word for word in normalize_title(text).split() if word not in STOPWORDS]
+    features = [f"w:{word}" for word in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return features
+
+def _hash_into(vector: np.ndarray, text: str, weight: float):
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        # The sign bit keeps colliding features from always adding up
+        vector[h % vector.shape[0]] += weight if h & 0x80000000 else -weight
+
+def vectorize(title: str, description: str | None = None, dim: int = VECTOR_DIM) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    _hash_into(vector, title or "", 1.0)
+    if description:
+        _hash_into(vector, description[:MAX_DESCRIPTION_CHARS], DESCRIPTION_WEIGHT)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticMatcher:
+    """
+    Hashed n-gram vectors of issue titles and descriptions kept in one NumPy matrix.
+
+    Scoring a task against every issue is a single matrix-vector product of L2-normalized
+    rows, i.e. cosine similarity. sync() only re-vectorizes issues whose content changed.
+    """
+
+    def __init__(self, dim: int = VECTOR_DIM):
+        self.dim = dim
+        self._matrix = np.zeros((64, dim), dtype=np.float32)
+        self._rows = {}
+        self._issues = {}
+        self._fingerprints = {}
+        self._free = list(range(63, -1, -1))
+        self._lock = threading.Lock()
+        self.version = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def sync(self, issues: list[dict], version=None):
+        """Upserts changed issues and drops ones no longer present."""
+        with self._lock:
+            seen = set()
+            for issue in issues:
+                seen.add(issue["id"])
+                self._upsert(issue)
+            for issue_id in list(self._rows):
+                if issue_id not in seen:
+                    self._remove(issue_id)
+            self.version = version
+
+    def upsert(self, issue: dict):
+        with self._lock:
+            self._upsert(issue)
+
+    def remove(self, issue_id: str):
+        with self._lock:
+            self._remove(issue_id)
+
+    def top_k(self, text: str, k: int = 5) -> list[tuple[dict, float]]:
+        """Returns up to k (issue, cosine score) pairs, best first."""
+        query = vectorize(text, dim=self.dim)
+        with self._lock:
+            if not self._rows:
+                return []
+            scores = self._matrix @ query
+            issue_by_row = {row: issue_id for issue_id, row in self._rows.items()}
+            k = min(k, len(issue_by_row))
+            # Free rows are all-zero and score 0, so over-select and filter them out
+            candidates = np.argsort(-scores)[:k + len(self._free)]
+            ranked = [(self._issues[issue_by_row[row]], float(scores[row])) for row in candidates if row in issue_by_row]
+        return ranked[:k]
+
+    def best_match(self, text: str) -> dict:
+        """
+        Returns {"issue", "score", "confident"}. confident is True when the top issue is a clear
+        match, or when nothing comes close (issue is then None); otherwise the caller should
+        fall back to the LLM.
+        """
+        ranked = self.top_k(text, k=2)
+        if not ranked or ranked[0][1] < NO_MATCH_SCORE:
+            return {"issue": None, "score": ranked[0][1] if ranked else 0.0, "confident": True}
+        best_issue, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confident = best_score >= CONFIDENT_SCORE and best_score - runner_up >= CONFIDENT_MARGIN
+        return {"issue": best_issue, "score": best_score, "confident": confident}
+
+    def _upsert(self, issue: dict):
+        fingerprint = (issue.get("title"), issue.get("description"))
+        issue_id = issue["id"]
+        self._issues[issue_id] = issue
+        if self._fingerprints.get(issue_id) == fingerprint:
+            return
+        row = self._rows.get(issue_id)
+        if row is None:
+            if not self._free:
+                self._grow()
+            row = self._free.pop()
+            self._rows[issue_id] = row
+        self._matrix[row] = vectorize(issue.get("title"), issue.get("description"), self.dim)
+        self._fingerprints[issue_id] = fingerprint
+
+    def _remove(self, issue_id: str):
+        row = self._rows.pop(issue_id, None)
+        self._issues.pop(issue_id, None)
+        self._fingerprints.pop(issue_id, None)
+        if row is not None:
+            self._matrix[row] = 0
+            self._free.append(row)
+
+    def _grow(self):
+        size = self._matrix.shape[0]
+        self._matrix = np.vstack([self._matrix, np.zeros((size, self.dim), dtype=np.float32)])
+        self._free.extend(range(2 * size - 1, size - 1, -1))
@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+SLACK_DIRECTORY_PATH = os.getenv("SLACK_DIRECTORY_PATH", "/tmp/slack_directory.json")
+SLACK_DIRECTORY_TTL = float(os.getenv("SLACK_DIRECTORY_TTL", str(24 * 3600)))
+# A lookup miss reloads users.list at most this often, so unknown emails can't cause a reload storm
+MIN_MISS_REFRESH_INTERVAL = float(os.getenv("SLACK_DIRECTORY_MISS_INTERVAL", "300"))
+# Total seconds one users.list crawl will spend waiting out 429s before giving up
+MAX_RATE_LIMIT_WAIT = float(os.getenv("SLACK_DIRECTORY_MAX_RATE_LIMIT_WAIT", "60"))
+
+USERS_LIST_URL = "https://slack.com/api/users.list"
+
+def _normalize(value: str | None) -> str:
+    return " ".join((value or "").lower().replace(".", " ").split())
+
+
+class SlackDirectory:
+    """
+    Email/id/name index of the Slack workspace's users, bulk-loaded from users.list.
+
+    The user list is persisted to a local JSON file with its load time, so restarts within
+    the TTL don't call Slack at all. After that it's only reloaded on TTL expiry or on a miss,
+    and never more than once per min_miss_interval, whether or not the last reload succeeded.
+    """
+
+    def __init__(self, token: str, path: str | None = SLACK_DIRECTORY_PATH, ttl: float = SLACK_DIRECTORY_TTL,
+                 min_miss_interval: float = MIN_MISS_REFRESH_INTERVAL):
+        self.token = token
+        self.path = path
+        self.ttl = ttl
+        self.min_miss_interval = min_miss_interval
+        self._users = []
+        self._by_email = {}
+        self._by_id = {}
+        self._by_name = {}
+        self._loaded_at = None
+        self._attempted_at = None
+        self._lock = threading.Lock()
+
+    def user_id_for_email(self, email: str) -> str | None:
+        user = self._lookup(lambda: self._by_email.get((email or "").lower()))
+        return user["id"] if user else None
+
+    def user_for_id(self, user_id: str) -> dict | None:
+        return self._lookup(lambda: self._by_id.get(user_id))
+
+    def user_for_name(self, name: str) -> dict | None:
+        """Matches display name or real name, case- and dot-insensitively ("nathan.kim" == "Nathan Kim")."""
+        return self._lookup(lambda: self._by_name.get(_normalize(name)))
+
+    def _lookup(self, find):
+        with self._lock:
+            if self._loaded_at is None:
+                self._load_from_file()
+            stale = self._loaded_at is None or time.time() - self._loaded_at > self.ttl
+            if stale and self._may_refresh():
+                self._refresh()
+                return find()
+            found = find()
+            if found is None and self._may_refresh():
+                self._refresh()
+                found = find()
+            return found
+
+    def _may_refresh(self) -> bool:
+        # Also applies before the first successful load, so a failing users.list isn't re-crawled on every lookup
+        return self._attempted_at is None or time.time() - self._attempted_at > self.min_miss_interval
+
+    def _refresh(self):
+        self._attempted_at = time.time()
+        try:
+            users = self._fetch_users()
+        except Exception as e:
+            print(f"❌ Could not load Slack users: {e}")
+            return
+        self._index(users, time.time())
+        self._save_to_file()
+
+    def _fetch_users(self) -> list[dict]:
+        headers = {"Authorization": f"Bearer {self.token}"}
+        users, cursor = [], None
+        waited = 0.0
+        while True:
+            params = {"limit": 200}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(USERS_LIST_URL, headers=headers, params=params, timeout=15)
+            if response.status_code == 429:
+                retry_after = float(response.headers.get("Retry-After", "1"))
+                if waited + retry_after > MAX_RATE_LIMIT_WAIT:
+                    raise Exception(f"users.list still rate limited after waiting {waited:.0f}s")
+                time.sleep(retry_after)
+                waited += retry_after
+                continue
+            data = response.json()
+            if not data.get("ok"):
+                raise Exception(data.get("error", response.text))
+            for member in data.get("members", []):
+                if member.get("deleted") or member.get("is_bot"):
+                    continue
+                profile = member.get("profile", {})
+                users.append({
+                    "id": member["id"],
+                    "name": member.get("name"),
+                    "email": profile.get("email"),
+                    "display_name": profile.get("display_name"),
+                    "real_name": profile.get("real_name") or member.get("real_name"),
+                })
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                return users
+
+    def _index(self, users: list[dict], loaded_at: float):
+        self._users = users
+        self._by_email = {user["email"].lower(): user for user in users if user.get("email")}
+        self._by_id = {user["id"]: user for user in users}
+        self._by_name = {}
+        for user in users:
+            for name in (user.get("real_name"), user.get("display_name"), user.get("name")):
+                if name:
+                    self._by_name.setdefault(_normalize(name), user)
+        self._loaded_at = loaded_at
+
+    def _load_from_file(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+            self._index(saved["users"], saved["loaded_at"])
+            self._attempted_at = self._loaded_at
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable Slack directory file: {e}")
+
+    def _save_to_file(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"loaded_at": self._loaded_at, "users": self._users}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save Slack directory: {e}")
@@ -1,10 +1,15 @@
-import os, requests, json
+import os, json
+from concurrent.futures import wait
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 import uuid
 from .name_email_map import NAME_EMAIL_MAP
 from .linear_tools import update_linear_issue
 from .get_secrets import get_secret
+from .slack_directory import SlackDirectory
+# Shared with Slack ingress; ADK puts agents_dir (src/) on sys.path when it loads the agent
+from slack_outbound import SlackOutbound
+from pending_updates import PendingUpdateStore, FirestoreBackend
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -20,28 +25,18 @@ LOCATION = "us-central1"
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
 SLACK_CHANNEL_ID = "C092ETPPY1F" # For testing, CHANGE THIS
+# How long post_approval_message waits for Slack before reporting the message as queued
+APPROVAL_SEND_TIMEOUT = float(os.getenv("SLACK_APPROVAL_SEND_TIMEOUT", "10"))
 
 app = App(token=SLACK_BOT_TOKEN)
 
-# --- FIREBASE HELPER METHODS ---
-# Save pending update
-def save_pending_update(ts: str, data: dict):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc_ref.set(data)
-
-# Load pending update
-def load_pending_update(ts: str):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        return None
+# Bulk-loaded once from users.list and persisted, so approval DMs never look users up one by one
+slack_directory = SlackDirectory(SLACK_BOT_TOKEN)
+# Paced, retried delivery of outgoing messages
+slack_outbound = SlackOutbound(SLACK_BOT_TOKEN)
 
-# Delete pending update
-def delete_pending_update(ts: str):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc_ref.delete()
+# Write-through cache over the pending_updates collection, shared with the reaction handler's schema
+pending_updates = PendingUpdateStore(FirestoreBackend(db))
 
 
 def get_email_for_name(name: str) -> str | None:
@@ -54,44 +49,55 @@ def get_email_for_name(name: str) -> str | None:
 
 def get_slack_user_id(email: str) -> str | None:
     """
-    Given an email, use Slack API to find user ID.
+    Given an email, find the Slack user ID in the workspace directory.
     """
     if email.lower() == "unidentified":
         return email.lower()
     
-    slack_url = "https://slack.com/api/users.lookupByEmail"
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}"
-    }
-    params = {
-        "email": email
-    }
-
-    response = requests.get(slack_url, headers=headers, params=params)
-    data = response.json()
-
-    if response.status_code == 200 and data.get("ok"):
-        return data["user"]["id"]
-    else:
-        print(f"❌ Could not find Slack user ID for {email}: {data.get('error')}")
-        return None
+    slack_user_id = slack_directory.user_id_for_email(email)
+    if slack_user_id:
+        return slack_user_id
+    print(f"❌ Could not find Slack user ID for {email}")
+    return None
     
-def post_approval_message(update_data: dict) -> dict:
+def send_approvals(messages: list[dict]) -> list[dict]:
     """
-    update_data: {
-        'name': '<Name>',
-        'cur_status': '<Current status>',
-        'exp_status': '<Expected status>',
-        'title': '<Linear issue title>'
-    }
+    Queues approval messages ({"channel", "text", "pending"}) and waits up to APPROVAL_SEND_TIMEOUT
+    for all of them together. Pending updates for delivered messages are saved in one batch;
+    any delivered after we stop waiting are saved as they arrive.
     """
+    futures = [slack_outbound.post_message(message["channel"], message["text"]) for message in messages]
+    done, not_done = wait(futures, timeout=APPROVAL_SEND_TIMEOUT)
+
+    def on_late_delivery(future, pending):
+        if future.exception() is None and future.result().get("ok"):
+            pending_updates.save(future.result()["ts"], pending)
+
+    results, delivered = [], {}
+    for future, message in zip(futures, messages):
+        if future in not_done:
+            future.add_done_callback(lambda f, pending=message["pending"]: on_late_delivery(f, pending))
+            results.append({"status": "queued"})
+        elif future.exception() is not None:
+            results.append({"status": "error", "error_message": str(future.exception())})
+        elif future.result().get("ok"):
+            delivered[future.result()["ts"]] = message["pending"]
+            results.append({"status": "success", "ts": future.result()["ts"]})
+        else:
+            results.append({"status": "error", "error_message": future.result().get("error", "Unknown error")})
+
+    pending_updates.save_many(delivered)
+    return results
+
+def build_approval(update_data: dict) -> tuple[dict | None, dict | None]:
+    """Returns (message, None) for an approval to send, or (None, result) if nothing should be sent."""
     # Terminates because no matching task - TODO create task in Linear instead of terminating
     if update_data.get("cur_status") is None or update_data.get("title") is None:
-        return {"status": "skipped", "reason": "Task doesn't exist"}
+        return None, {"status": "skipped", "reason": "Task doesn't exist"}
     
     # Terminates if Linear is already updated
     if update_data.get("cur_status").lower() == update_data.get("exp_status").lower():
-        return {"status": "skipped", "reason": "Linear is up to date"}
+        return None, {"status": "skipped", "reason": "Linear is up to date"}
 
     update_id = str(uuid.uuid4())
 
@@ -99,6 +105,7 @@ def post_approval_message(update_data: dict) -> dict:
     title = update_data.get("title", "Unidentified")
     cur_status = update_data.get("cur_status", "Unidentified")
     exp_status = update_data.get("exp_status", "Unidentified")
+    pending = {"update_id": update_id, "title": title, "exp_status": exp_status}
 
     # --- STANDUP CHANNEL MESSAGE ---
     if name.lower() == "unidentified":
@@ -108,29 +115,7 @@ def post_approval_message(update_data: dict) -> dict:
             f"from `{cur_status.title()}` → `{exp_status.title()}`\n"
             "React with :+1: to approve update, or :-1: to cancel"
         )
-        slack_url = "https://slack.com/api/chat.postMessage"
-        payload = {
-            "channel": SLACK_CHANNEL_ID,
-            "text": text
-        }
-        headers = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-
-        response = requests.post(slack_url, headers=headers, json=payload)
-        data = response.json()
-
-        if response.status_code == 200 and data.get("ok"):
-            ts = data["ts"]
-            save_pending_update(ts, {
-                "update_id": update_id,
-                "title": title,
-                "exp_status": exp_status
-            })
-            return {"status": "success", "ts": ts}
-        else:
-            return {"status": "error", "error_message": data.get("error", response.text)}
+        return {"channel": SLACK_CHANNEL_ID, "text": text, "pending": pending}, None
     
     # --- DM ON SLACK ---
     else:
@@ -144,33 +129,40 @@ def post_approval_message(update_data: dict) -> dict:
         )
 
         if not email:
-            return {"status": "error", "error_message": f"No email found for name: {name}"}
+            return None, {"status": "error", "error_message": f"No email found for name: {name}"}
 
         slack_user_id = get_slack_user_id(email)
 
         if not slack_user_id:
-            return {"status": "error", "error_message": f"Slack user ID not found for email: {email}"}
-
-        slack_url = "https://slack.com/api/chat.postMessage"
-        payload = {
-            "channel": slack_user_id,
-            "text": text
-        }
-        headers = {
-            "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-            "Content-Type": "application/json; charset=utf-8"
-        }
-
-        response = requests.post(slack_url, headers=headers, json=payload)
-        data = response.json()
-
-        if response.status_code == 200 and data.get("ok"):
-            ts = data["ts"]
-            save_pending_update(ts, {
-                "update_id": update_id,
-                "title": title,
-                "exp_status": exp_status
-            })
-            return {"status": "success", "ts": ts}
+            return None, {"status": "error", "error_message": f"Slack user ID not found for email: {email}"}
+
+        return {"channel": slack_user_id, "text": text, "pending": pending}, None
+
+def post_approval_messages(updates: list[dict]) -> list[dict]:
+    """
+    Sends approval requests for several updates at once. Each item has the same keys as
+    post_approval_message's update_data; results are returned in the same order.
+    """
+    results = [None] * len(updates)
+    messages, positions = [], []
+    for i, update_data in enumerate(updates):
+        message, result = build_approval(update_data)
+        if message is None:
+            results[i] = result
         else:
-            return {"status": "error", "error_message": data.get("error", response.text)}
\ No newline at end of file
+            messages.append(message)
+            positions.append(i)
+    for i, result in zip(positions, send_approvals(messages)):
+        results[i] = result
+    return results
+
+def post_approval_message(update_data: dict) -> dict:
+    """
+    update_data: {
+        'name': '<Name>',
+        'cur_status': '<Current status>',
+        'exp_status': '<Expected status>',
+        'title': '<Linear issue title>'
+    }
+    """
+    return post_approval_messages([update_data])[0]
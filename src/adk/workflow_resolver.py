@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+from .issue_index import normalize_title
+
+RESOLVER_TTL = float(os.getenv("LINEAR_RESOLVER_TTL", "3600"))
+# A miss triggers a reload at most this often so unknown names can't hammer Linear
+MIN_MISS_RELOAD_INTERVAL = float(os.getenv("LINEAR_RESOLVER_MISS_INTERVAL", "30"))
+
+
+class WorkflowResolver:
+    """
+    Cached lookup of Linear team ids and per-team workflow state ids.
+
+    Workflow state names repeat across teams ("In Progress" exists once per team),
+    so state ids are keyed by (team_id, normalized name). Data is loaded once and
+    reloaded when older than ttl or when a lookup misses.
+
+    load() must return (teams, states) where teams are {id, name} and states are
+    {id, name, team: {id}} nodes.
+    """
+
+    def __init__(self, load, ttl: float = RESOLVER_TTL, min_miss_interval: float = MIN_MISS_RELOAD_INTERVAL):
+        self._load = load
+        self.ttl = ttl
+        self.min_miss_interval = min_miss_interval
+        self._teams = {}
+        self._states = {}
+        self._states_by_name = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def team_id(self, team_name: str) -> str | None:
+        return self._lookup(lambda: self._teams.get(normalize_title(team_name)))
+
+    def state_id(self, state_name: str, team_id: str | None = None) -> str | None:
+        """
+        Returns the id of the named state in the given team. Without a team the first
+        state with that name is returned, which is only safe in single-team workspaces.
+        """
+        key = normalize_title(state_name)
+        if team_id is None:
+            return self._lookup(lambda: (self._states_by_name.get(key) or [None])[0])
+        return self._lookup(lambda: self._states.get((team_id, key)))
+
+    def add_team_states(self, team_id: str, states: list[dict]):
+        """Merges states fetched elsewhere (e.g. alongside an issue) without a full reload."""
+        with self._lock:
+            for state in states:
+                self._add_state(team_id, state)
+
+    def remove_state(self, state_id: str):
+        with self._lock:
+            self._states = {key: value for key, value in self._states.items() if value != state_id}
+            self._states_by_name = {
+                key: [value for value in ids if value != state_id]
+                for key, ids in self._states_by_name.items()
+            }
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _lookup(self, find):
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at > self.ttl:
+                self._reload()
+                return find()
+            found = find()
+            if found is None and now - self._loaded_at > self.min_miss_interval:
+                self._reload()
+                found = find()
+            return found
+
+    def _reload(self):
+        teams, states = self._load()
+        self._teams = {normalize_title(team["name"]): team["id"] for team in teams}
+        self._states = {}
+        self._states_by_name = {}
+        for state in states:
+            self._add_state((state.get("team") or {}).get("id"), state)
+        self._loaded_at = time.monotonic()
+
+    def _add_state(self, team_id: str | None, state: dict):
+        key = normalize_title(state["name"])
+        self._states[(team_id, key)] = state["id"]
+        ids = self._states_by_name.setdefault(key, [])
+        if state["id"] not in ids:
+            ids.append(state["id"])
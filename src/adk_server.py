@@ -0,0 +1,37 @@
+"""
+Serves the ADK agent together with the Linear webhook, so webhook deliveries update the same
+issue cache and workflow states the agent's tools read.
+
+    uvicorn adk_server:app --host 0.0.0.0 --port 8080
+
+Run from src/. Besides ADK's own routes (/run_sse, /apps/...) it adds POST /linear/webhook and
+GET /linear/cache-stats.
+"""
+import os
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from google.adk.cli.fast_api import get_fast_api_app
+
+from adk.linear_tools import issue_cache, workflow_resolver, get_issue_cache_stats
+from adk.linear_webhooks import handle_webhook
+
+AGENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+app = get_fast_api_app(agents_dir=AGENTS_DIR, web=False)
+
+@app.post("/linear/webhook")
+async def linear_webhook(request: Request):
+    # ADK loads the agent as the adk package from AGENTS_DIR, so this is the cache its tools use
+    raw_body = await request.body()
+    body, status = await run_in_threadpool(
+        handle_webhook, raw_body, request.headers.get("Linear-Signature"), issue_cache, workflow_resolver
+    )
+    if status != 200:
+        print(f"Rejected Linear webhook: {body}")
+    return PlainTextResponse(body, status_code=status)
+
+@app.get("/linear/cache-stats")
+def linear_cache_stats():
+    return get_issue_cache_stats()
@@ -0,0 +1,28 @@
+import json
+
+ADK_BASE_URL = "https://adk-service-668646793196.us-central1.run.app"
+
+def buildRequestJson(agentName, user_id, session_id, user_message) -> dict:
+    return {
+        "appName": agentName,
+        "userId": user_id,
+        "sessionId": session_id,
+        "newMessage": {
+            "role": "User",
+            "parts": [{"text": user_message}]
+        }
+    }
+
+def parse_sse_text(line: str) -> str | None:
+    """Returns the last text part of one /run_sse "data: " line, or None if it has none."""
+    if not line or not line.startswith("data: "):
+        return None
+    text = None
+    try:
+        parsed = json.loads(line[len("data: "):])
+        for part in parsed.get("content", {}).get("parts", []):
+            if "text" in part:
+                text = part["text"]
+    except Exception as e:
+        print(f"Error parsing chunk: {e}")
+    return text
@@ -0,0 +1,112 @@
+import os
+import random
+import threading
+import time
+
+import vertexai
+from google.api_core import exceptions as google_exceptions
+from vertexai.generative_models import GenerativeModel
+
+PROJECT_ID = "szns-tpm-bot"
+LOCATION = "us-central1"
+DEFAULT_MODEL = "gemini-2.0-flash-lite"
+
+# Caps concurrent Gemini requests from this process to stay within quota
+MAX_IN_FLIGHT = int(os.getenv("GEMINI_MAX_IN_FLIGHT", "8"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+_init_lock = threading.Lock()
+_initialized = False
+_models = {}
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+_stats_lock = threading.Lock()
+_stats = {}
+
+def ensure_initialized(get_credentials=None):
+    """
+    Runs vertexai.init once per process. get_credentials is an optional zero-argument callable
+    and is only invoked the first time, so credential lookups don't repeat on every call.
+    """
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        credentials = get_credentials() if get_credentials else None
+        vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
+        _initialized = True
+
+def get_model(model_name: str = DEFAULT_MODEL) -> GenerativeModel:
+    """Returns a shared model handle, creating it on first use."""
+    ensure_initialized()
+    model = _models.get(model_name)
+    if model is None:
+        with _init_lock:
+            model = _models.setdefault(model_name, GenerativeModel(model_name))
+    return model
+
+def generate_content(prompt: str, call_site: str, model_name: str = DEFAULT_MODEL, get_credentials=None):
+    """
+    Sends prompt to Gemini and returns the response. Requests beyond MAX_IN_FLIGHT wait for a
+    slot, quota and transient errors are retried with jittered exponential backoff, and tokens
+    and latency are recorded under call_site.
+    """
+    ensure_initialized(get_credentials)
+    model = get_model(model_name)
+    attempt = 0
+    while True:
+        started = time.monotonic()
+        try:
+            with _in_flight:
+                response = model.generate_content(prompt)
+        except RETRYABLE_ERRORS as e:
+            attempt += 1
+            _record(call_site, time.monotonic() - started, retried=True)
+            if attempt > MAX_RETRIES:
+                _record(call_site, 0.0, failed=True)
+                raise
+            delay = random.uniform(0, min(30.0, 2 ** attempt))
+            print(f"[gemini] {call_site}: {type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        except Exception:
+            _record(call_site, time.monotonic() - started, failed=True)
+            raise
+        _record(call_site, time.monotonic() - started, response=response)
+        return response
+
+def stats() -> dict:
+    """Per call site counts, token totals and latency."""
+    with _stats_lock:
+        return {site: dict(values) for site, values in _stats.items()}
+
+def _record(call_site: str, latency: float, response=None, retried: bool = False, failed: bool = False):
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    response_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    with _stats_lock:
+        site = _stats.setdefault(call_site, {
+            "calls": 0, "retries": 0, "errors": 0,
+            "prompt_tokens": 0, "response_tokens": 0,
+            "total_latency": 0.0, "max_latency": 0.0,
+        })
+        if retried:
+            site["retries"] += 1
+        elif failed:
+            site["errors"] += 1
+        else:
+            site["calls"] += 1
+            site["prompt_tokens"] += prompt_tokens
+            site["response_tokens"] += response_tokens
+            site["total_latency"] += latency
+            site["max_latency"] = max(site["max_latency"], latency)
+    if response is not None:
+        print(f"[gemini] {call_site}: {latency:.2f}s, {prompt_tokens} prompt / {response_tokens} response tokens")
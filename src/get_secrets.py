@@ -1,7 +1,106 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from google.cloud import secretmanager
 
-def get_secret(secret_id, project_id):
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    response = client.access_secret_version(request={"name": name})
-    return response.payload.data.decode("utf-8")
+# Seconds a fetched "latest" value is reused before Secret Manager is asked again
+SECRET_CACHE_TTL = float(os.getenv("SECRET_CACHE_TTL", "300"))
+SECRET_FETCH_CONCURRENCY = int(os.getenv("SECRET_FETCH_CONCURRENCY", "8"))
+# Pins secrets to fixed versions, e.g. SECRET_VERSIONS="SLACK_BOT_TOKEN=3,TPM_BOT_USER_ID=1"
+PINNED_VERSIONS = dict(
+    entry.split("=", 1) for entry in os.getenv("SECRET_VERSIONS", "").split(",") if "=" in entry
+)
+
+class SecretProvider:
+    """
+    Secret Manager access through one shared client, with values cached in memory.
+
+    "latest" values are cached for ttl seconds; numbered versions never change, so they're cached
+    for the life of the process. If a refresh fails the previous value keeps being served.
+    """
+
+    def __init__(self, ttl: float = SECRET_CACHE_TTL, client=None):
+        self.ttl = ttl
+        self._client = client
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "fetches": 0, "errors": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = secretmanager.SecretManagerServiceClient()
+        return self._client
+
+    def get(self, secret_id: str, project_id: str, version: str | None = None) -> str:
+        return self.get_many([secret_id], project_id, version)[secret_id]
+
+    def get_many(self, secret_ids, project_id: str, version: str | None = None) -> dict[str, str]:
+        """Returns {secret_id: value}, fetching every uncached secret in parallel."""
+        names = {secret_id: self._name(secret_id, project_id, version) for secret_id in secret_ids}
+        values, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for secret_id, name in names.items():
+                cached = self._cache.get(name)
+                if cached and (cached[0] is None or now < cached[0]):
+                    values[secret_id] = cached[1]
+                    self._stats["hits"] += 1
+                else:
+                    missing.append(secret_id)
+
+        if len(missing) == 1:
+            values[missing[0]] = self._fetch(names[missing[0]])
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(SECRET_FETCH_CONCURRENCY, len(missing))) as executor:
+                fetched = executor.map(lambda secret_id: self._fetch(names[secret_id]), missing)
+                values.update(zip(missing, fetched))
+        return values
+
+    def invalidate(self, secret_id: str | None = None):
+        with self._lock:
+            if secret_id is None:
+                self._cache.clear()
+            else:
+                self._cache = {name: value for name, value in self._cache.items() if f"/secrets/{secret_id}/" not in name}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "cached": len(self._cache)}
+
+    @staticmethod
+    def _name(secret_id: str, project_id: str, version: str | None) -> str:
+        version = version or PINNED_VERSIONS.get(secret_id, "latest")
+        return f"projects/{project_id}/secrets/{secret_id}/versions/{version}"
+
+    def _fetch(self, name: str) -> str:
+        try:
+            response = self.client.access_secret_version(request={"name": name})
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                cached = self._cache.get(name)
+            if cached:
+                print(f"Could not refresh secret {name}, using cached value: {e}")
+                return cached[1]
+            raise
+        value = response.payload.data.decode("utf-8")
+        # Numbered versions are immutable, "latest" and version aliases can move
+        expires = None if name.rsplit("/", 1)[1].isdigit() else time.monotonic() + self.ttl
+        with self._lock:
+            self._cache[name] = (expires, value)
+            self._stats["fetches"] += 1
+        return value
+
+
+_provider = SecretProvider()
+
+def get_secret(secret_id, project_id, version=None):
+    return _provider.get(secret_id, project_id, version)
+
+def get_many(secret_ids, project_id, version=None) -> dict[str, str]:
+    return _provider.get_many(secret_ids, project_id, version)
@@ -1,18 +1,17 @@
 import json
-import vertexai
 import re
 import os
 import time
 
 from .get_transcripts import get_transcript_docs
-from google.cloud import pubsub_v1
-from vertexai.preview.generative_models import GenerativeModel
 from googleapiclient.discovery import build
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
 from dotenv import load_dotenv
 from name_email_map import NAME_EMAIL_MAP
 import google.auth
 from get_secrets import get_secret
+import gemini_gateway
+import pubsub_publisher
 script_dir = os.path.dirname(__file__)
 prompt_path = os.path.join(script_dir, "summarize_prompt.txt")
 
@@ -50,9 +49,6 @@ def match_name_with_gemini(ai_name: str) -> str:
     # Get keys from your permanent mapping
     name_list = list(NAME_EMAIL_MAP.keys())
 
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
-
     prompt = f"""
         You are an assistant at SZNS. You need to match a possibly misspelled or incomplete first name from a standup summary to a known list of teammate names.
 
@@ -70,7 +66,7 @@ def match_name_with_gemini(ai_name: str) -> str:
         Only return the best matching name or "Unidentified". Do not explain.
     """
 
-    response = model.generate_content(prompt)
+    response = gemini_gateway.generate_content(prompt, call_site="match_name_with_gemini")
     matched_name = response.text.strip().lower()
 
     return matched_name
@@ -97,9 +93,6 @@ def update_names_in_summary(summary: list[dict]) -> list[dict]:
 
 def summarize_transcript(transcript_text):
     """ """
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
-    model = GenerativeModel("gemini-2.0-flash-lite")
-
     script_dir = os.path.abspath(os.path.dirname(__file__))
     prompt_path = os.path.join(script_dir, "summarize_prompt.txt")
     # --- TODO: IMPROVE PROMPT IN summarize_prompt.txt ---
@@ -108,7 +101,7 @@ def summarize_transcript(transcript_text):
 
     prompt = f"{prompt_template}\n{transcript_text}"
 
-    response = model.generate_content(prompt)
+    response = gemini_gateway.generate_content(prompt, call_site="summarize_transcript")
     return response.text
 
 def move_to_processed_folder(service, file_id, processed_folder_id):
@@ -131,14 +124,6 @@ def extract_json_block(text):
     match = re.search(r"\[\s*{.*}\s*\]", text, re.DOTALL)
     return match.group(0) if match else None
 
-def publish_to_pubsub(project_id, topic_id, message_dict):
-    """ """
-    publisher = pubsub_v1.PublisherClient()
-    topic_path = publisher.topic_path(project_id, topic_id)
-    data = json.dumps(message_dict).encode("utf-8")
-    future = publisher.publish(topic_path, data=data)
-    return future.result()
-
 if __name__ == '__main__':
     creds = get_credentials()
     drive_service = build("drive", "v3", credentials=creds)
@@ -164,8 +149,7 @@ if __name__ == '__main__':
 
                         print(updated_result)  # After names updated
 
-                        for task in updated_result:
-                            publish_to_pubsub(PROJECT_ID, TOPIC_ID, task)
+                        pubsub_publisher.publish_many(PROJECT_ID, TOPIC_ID, updated_result)
                     else:
                         print(f"No valid JSON array found in Gemini output for {name}")
 
@@ -0,0 +1,264 @@
+"""
+Store for Linear updates waiting on a Slack reaction, keyed by the approval message's ts.
+
+    python pending_updates.py [--count 200] [--latency 0.02]
+
+benchmarks the store against the in-memory backend, with latency simulating Firestore round-trips.
+Saves and loads go through separate stores sharing one backend, as they do in production.
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+PENDING_UPDATES_COLLECTION = "pending_updates"
+# Approvals nobody reacts to within this many seconds expire. Firestore deletes expired documents
+# itself once a TTL policy on the expires_at field is enabled for the collection.
+PENDING_UPDATE_TTL = float(os.getenv("PENDING_UPDATE_TTL", str(7 * 24 * 3600)))
+# Firestore allows at most 500 writes per batch
+FIRESTORE_BATCH_LIMIT = 500
+# An approval is saved just after its message is posted, so a message posted up to this many seconds
+# before the index was last read may still have been saved after that read
+INDEX_GRACE_SECONDS = float(os.getenv("PENDING_UPDATE_INDEX_GRACE", "60"))
+
+class FirestoreBackend:
+    def __init__(self, client=None, collection: str = PENDING_UPDATES_COLLECTION):
+        self._client = client
+        self.collection = collection
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import firestore
+            self._client = firestore.Client()
+        return self._client
+
+    def get(self, ts: str) -> dict | None:
+        doc = self.client.collection(self.collection).document(ts).get()
+        return doc.to_dict() if doc.exists else None
+
+    def set_many(self, items: dict[str, dict]):
+        """Writes every item, one batch commit per FIRESTORE_BATCH_LIMIT documents."""
+        collection = self.client.collection(self.collection)
+        entries = list(items.items())
+        for start in range(0, len(entries), FIRESTORE_BATCH_LIMIT):
+            batch = self.client.batch()
+            for ts, data in entries[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.set(collection.document(ts), data)
+            batch.commit()
+
+    def delete(self, ts: str):
+        self.client.collection(self.collection).document(ts).delete()
+
+    def keys(self) -> set[str]:
+        return {doc.id for doc in self.client.collection(self.collection).select([]).stream()}
+
+    def watch(self, on_keys):
+        """
+        Calls on_keys(set of ts, read_time) with the collection's current keys now and after every
+        change. read_time is the epoch seconds the snapshot was read at.
+        """
+        return self.client.collection(self.collection).on_snapshot(
+            lambda docs, changes, read_time: on_keys({doc.id for doc in docs}, read_time.timestamp())
+        )
+
+
+class InMemoryBackend:
+    """Stand-in for Firestore when running locally or benchmarking. latency is added to every round-trip."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.round_trips = 0
+        self._docs = {}
+        self._lock = threading.Lock()
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, ts: str) -> dict | None:
+        self._round_trip()
+        with self._lock:
+            data = self._docs.get(ts)
+            return dict(data) if data is not None else None
+
+    def set_many(self, items: dict[str, dict]):
+        for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+            self._round_trip()
+        with self._lock:
+            self._docs.update({ts: dict(data) for ts, data in items.items()})
+
+    def delete(self, ts: str):
+        self._round_trip()
+        with self._lock:
+            self._docs.pop(ts, None)
+
+    def keys(self) -> set[str]:
+        self._round_trip()
+        with self._lock:
+            return set(self._docs)
+
+
+class PendingUpdateStore:
+    """
+    Pending updates with an in-memory write-through cache in front of the backend.
+
+    Every save writes to the backend before the cache, so other instances and restarts still see
+    it. Approvals are saved by the ADK service but loaded by Slack ingress, so in practice the
+    cache rarely serves a load; the gain is in batching writes with save_many().
+    Entries carry an expires_at timestamp and are treated as missing once it has passed.
+
+    It also keeps an index of every pending ts, so callers can rule out unrelated messages with
+    might_contain() before paying for a load. Until rebuild_index() or watch() has filled the
+    index, might_contain() answers True for everything, and afterwards it still does for messages
+    posted too recently for the index to be sure about.
+    """
+
+    def __init__(self, backend=None, ttl: float = PENDING_UPDATE_TTL):
+        self.backend = backend if backend is not None else FirestoreBackend()
+        self.ttl = ttl
+        self._cache = {}
+        self._index = None
+        self._index_time = None
+        self._watch = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "batches": 0, "expired": 0, "filtered": 0}
+
+    def save(self, ts: str, data: dict):
+        self.save_many({ts: data})
+
+    def save_many(self, items: dict[str, dict]):
+        """Saves several pending updates with batched backend writes."""
+        if not items:
+            return
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=self.ttl)
+        stamped = {ts: {**data, "created_at": now, "expires_at": expires_at} for ts, data in items.items()}
+        self.backend.set_many(stamped)
+        with self._lock:
+            self._cache = {ts: data for ts, data in self._cache.items() if not self._expired(data)}
+            self._cache.update(stamped)
+            if self._index is not None:
+                self._index.update(stamped)
+            self._stats["writes"] += len(stamped)
+            self._stats["batches"] += 1
+
+    def load(self, ts: str) -> dict | None:
+        with self._lock:
+            data = self._cache.get(ts)
+        if data is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+        else:
+            data = self.backend.get(ts)
+            with self._lock:
+                self._stats["misses"] += 1
+                if data is not None:
+                    self._cache[ts] = data
+
+        if data is not None and self._expired(data):
+            # Firestore's TTL sweep can lag by a day, so expiry is enforced on read too
+            self.delete(ts)
+            with self._lock:
+                self._stats["expired"] += 1
+            return None
+        return data
+
+    def delete(self, ts: str):
+        self.backend.delete(ts)
+        with self._lock:
+            self._cache.pop(ts, None)
+            if self._index is not None:
+                self._index.discard(ts)
+
+    def might_contain(self, ts: str) -> bool:
+        """False only if ts is definitely not pending, without a backend read."""
+        with self._lock:
+            if self._index is None or ts in self._index or self._newer_than_index(ts):
+                return True
+            self._stats["filtered"] += 1
+            return False
+
+    def rebuild_index(self):
+        read_time = time.time()
+        keys = self.backend.keys()
+        with self._lock:
+            self._index = set(keys)
+            self._index_time = read_time
+
+    def watch(self):
+        """
+        Keeps the index in sync with the backend, including approvals saved by other processes.
+        Falls back to a one-off rebuild for backends that can't push changes.
+        """
+        if self._watch is not None:
+            return
+        if not hasattr(self.backend, "watch"):
+            self.rebuild_index()
+            return
+
+        def on_keys(keys, read_time):
+            with self._lock:
+                self._index = keys
+                self._index_time = read_time
+                # Drop cached entries deleted elsewhere, e.g. by the reaction handler on another instance
+                self._cache = {ts: data for ts, data in self._cache.items() if ts in keys}
+
+        self._watch = self.backend.watch(on_keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "cached": len(self._cache), "indexed": None if self._index is None else len(self._index)}
+
+    def _newer_than_index(self, ts: str) -> bool:
+        # A Slack ts is the message's post time in epoch seconds. An approval saved after the index
+        # was read isn't in it yet, even while the listener is delivering the change.
+        try:
+            return float(ts) > self._index_time - INDEX_GRACE_SECONDS
+        except (TypeError, ValueError):
+            return True
+
+    @staticmethod
+    def _expired(data: dict) -> bool:
+        expires_at = data.get("expires_at")
+        # Documents written before TTL fields existed never expire
+        return expires_at is not None and expires_at <= datetime.now(timezone.utc)
+
+
+def benchmark(count: int, latency: float) -> dict:
+    items = {f"{1700000000 + i}.000100": {"update_id": str(i), "title": f"Task {i}", "exp_status": "Done"} for i in range(count)}
+    results = {}
+
+    backend = InMemoryBackend(latency)
+    started = time.perf_counter()
+    for ts, data in items.items():
+        backend.set_many({ts: data})
+    for ts in items:
+        backend.get(ts)
+    results["uncached_one_by_one"] = {"seconds": round(time.perf_counter() - started, 3), "round_trips": backend.round_trips}
+
+    # The saving process never loads, the loading process starts cold
+    backend = InMemoryBackend(latency)
+    saver, reader = PendingUpdateStore(backend), PendingUpdateStore(backend)
+    started = time.perf_counter()
+    saver.save_many(items)
+    for ts in items:
+        reader.load(ts)
+    results["store_batched"] = {
+        "seconds": round(time.perf_counter() - started, 3),
+        "round_trips": backend.round_trips,
+        "write_batches": saver.stats()["batches"],
+        "load_hits": reader.stats()["hits"],
+        "load_misses": reader.stats()["misses"],
+    }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pending update store against an in-memory backend.")
+    parser.add_argument("--count", type=int, default=200, help="number of pending updates to save and load")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per backend round-trip")
+    args = parser.parse_args()
+    for name, result in benchmark(args.count, args.latency).items():
+        print(f"{name}: {result}")
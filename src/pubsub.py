@@ -1,22 +1,10 @@
 from flask import Flask, request
 import base64, json, uuid, requests, re
 import os
+from adk_sse import ADK_BASE_URL, buildRequestJson, parse_sse_text
 
 app = Flask(__name__)
 
-ADK_BASE_URL = "https://adk-service-668646793196.us-central1.run.app"
-
-def buildRequestJson(agentName, user_id, session_id, user_message) -> dict:
-    return {
-        "appName": agentName,
-        "userId": user_id,
-        "sessionId": session_id,
-        "newMessage": {
-            "role": "User",
-            "parts": [{"text": user_message}]
-        }
-    }
-
 @app.route("/", methods=["POST"])
 def pubsub_handler():
     envelope = request.get_json()
@@ -48,17 +36,9 @@ def pubsub_handler():
         collected_text = ""
         with requests.post(sse_url, data=json.dumps(sse_payload), headers=headers, stream=True) as resp:
             for line in resp.iter_lines(decode_unicode=True):
-                if line and line.startswith("data: "):
-                    raw_json = line[len("data: "):]
-                    try:
-                        parsed = json.loads(raw_json)
-                        content = parsed.get("content", {})
-                        parts = content.get("parts", [])
-                        for part in parts:
-                            if "text" in part:
-                                collected_text = part["text"]
-                    except Exception as e:
-                        print(f"Error parsing chunk: {e}")
+                text = parse_sse_text(line)
+                if text is not None:
+                    collected_text = text
 
         print(f"ADK response: {collected_text.strip() if collected_text else 'No response'}")
         return "OK", 200
@@ -0,0 +1,126 @@
+"""
+Asyncio variant of the Pub/Sub push relay in pubsub.py. Each push holds a coroutine rather than a
+worker thread while its ADK /run_sse stream is open, so one process can relay hundreds at once.
+
+    uvicorn pubsub_asgi:app --host 0.0.0.0 --port 8080
+
+Run from src/. The Flask app in pubsub.py stays as the fallback for the push route.
+"""
+import asyncio
+import base64
+import json
+import os
+import uuid
+
+import httpx
+
+from adk_sse import ADK_BASE_URL, buildRequestJson, parse_sse_text
+
+# Pushes relayed to ADK at once; beyond this new pushes wait briefly, then get a 429 so Pub/Sub retries later
+MAX_INFLIGHT = int(os.getenv("PUBSUB_MAX_INFLIGHT", "200"))
+SLOT_WAIT_SECONDS = float(os.getenv("PUBSUB_SLOT_WAIT_SECONDS", "5"))
+# ADK can stay silent for a long time between SSE events while tools run
+ADK_READ_TIMEOUT = float(os.getenv("ADK_READ_TIMEOUT", "300"))
+
+_client = None
+_slots = None
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, read=ADK_READ_TIMEOUT),
+            limits=httpx.Limits(max_connections=MAX_INFLIGHT, max_keepalive_connections=MAX_INFLIGHT),
+        )
+    return _client
+
+def get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(MAX_INFLIGHT)
+    return _slots
+
+async def relay_to_adk(data: dict) -> tuple[str, int]:
+    """Creates an ADK session for one task and reads its /run_sse stream to the end."""
+    session_id = str(uuid.uuid4())
+    user_id = "user"
+    headers = {"Content-Type": "application/json"}
+    client = get_client()
+
+    session_response = await client.post(f"{ADK_BASE_URL}/apps/adk/users/{user_id}/sessions/{session_id}", headers=headers)
+    session_data = session_response.json()
+    if not session_data.get("id"):
+        print(f"Failed to create session. Raw: {session_data}")
+        return "Session creation failed", 500
+
+    sse_payload = buildRequestJson("adk", user_id, session_id, json.dumps(data, indent=2))
+    collected_text = ""
+    async with client.stream("POST", f"{ADK_BASE_URL}/run_sse", content=json.dumps(sse_payload), headers=headers) as resp:
+        async for line in resp.aiter_lines():
+            text = parse_sse_text(line)
+            if text is not None:
+                collected_text = text
+
+    print(f"ADK response: {collected_text.strip() if collected_text else 'No response'}")
+    return "OK", 200
+
+async def handle_push(body: bytes) -> tuple[str, int]:
+    try:
+        envelope = json.loads(body)
+    except ValueError:
+        envelope = None
+    if not envelope or "message" not in envelope:
+        return "Bad request: no Pub/Sub message received", 400
+
+    slots = get_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), SLOT_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        return "Too many in-flight messages", 429
+    try:
+        payload = base64.b64decode(envelope["message"]["data"]).decode("utf-8")
+        data = json.loads(payload)
+        print("Received message:", json.dumps(data, indent=2))
+        return await relay_to_adk(data)
+    except Exception as e:
+        print(f"Exception while processing message: {e}")
+        return "Error", 500
+    finally:
+        slots.release()
+
+async def read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+async def respond(send, body: str, status: int):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+    await send({"type": "http.response.body", "body": body.encode("utf-8")})
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                get_client()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if _client is not None:
+                    await _client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] != "http":
+        return
+    if scope["method"] != "POST":
+        await respond(send, "Method not allowed", 405)
+        return
+
+    body = await read_body(receive)
+    if scope["path"] == "/":
+        await respond(send, *await handle_push(body))
+    else:
+        await respond(send, "Not found", 404)
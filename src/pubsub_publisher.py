@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1.types import BatchSettings, LimitExceededBehavior, PublisherOptions, PublishFlowControl
+
+# A batch is sent once it reaches any of these limits
+BATCH_MAX_MESSAGES = int(os.getenv("PUBSUB_BATCH_MAX_MESSAGES", "100"))
+BATCH_MAX_BYTES = int(os.getenv("PUBSUB_BATCH_MAX_BYTES", str(1024 * 1024)))
+BATCH_MAX_LATENCY = float(os.getenv("PUBSUB_BATCH_MAX_LATENCY", "0.05"))
+# Publishing blocks instead of buffering without bound once this much is outstanding
+FLOW_MAX_MESSAGES = int(os.getenv("PUBSUB_FLOW_MAX_MESSAGES", "1000"))
+FLOW_MAX_BYTES = int(os.getenv("PUBSUB_FLOW_MAX_BYTES", str(10 * 1024 * 1024)))
+PUBLISH_TIMEOUT = float(os.getenv("PUBSUB_PUBLISH_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_publisher = None
+_stats = {"calls": 0, "published": 0, "failed": 0, "total_seconds": 0.0, "max_seconds": 0.0, "max_batch": 0}
+
+def get_publisher(get_credentials=None) -> pubsub_v1.PublisherClient:
+    """
+    Returns the process-wide PublisherClient, creating it on first use. get_credentials is an
+    optional zero-argument callable and is only invoked then.
+    """
+    global _publisher
+    if _publisher is not None:
+        return _publisher
+    with _lock:
+        if _publisher is None:
+            credentials = get_credentials() if get_credentials else None
+            _publisher = pubsub_v1.PublisherClient(
+                credentials=credentials,
+                batch_settings=BatchSettings(
+                    max_messages=BATCH_MAX_MESSAGES,
+                    max_bytes=BATCH_MAX_BYTES,
+                    max_latency=BATCH_MAX_LATENCY,
+                ),
+                publisher_options=PublisherOptions(
+                    flow_control=PublishFlowControl(
+                        message_limit=FLOW_MAX_MESSAGES,
+                        byte_limit=FLOW_MAX_BYTES,
+                        limit_exceeded_behavior=LimitExceededBehavior.BLOCK,
+                    ),
+                ),
+            )
+    return _publisher
+
+def publish_many(project_id: str, topic_id: str, messages: list[dict], get_credentials=None,
+                 timeout: float = PUBLISH_TIMEOUT) -> list[str | None]:
+    """
+    Publishes every message as JSON and waits for all of them together, so they go out in shared
+    batches. Returns the message ids in order, with None for any message that failed or timed out.
+    """
+    if not messages:
+        return []
+    publisher = get_publisher(get_credentials)
+    topic_path = publisher.topic_path(project_id, topic_id)
+
+    started = time.perf_counter()
+    futures = [publisher.publish(topic_path, data=json.dumps(message).encode("utf-8")) for message in messages]
+    wait(futures, timeout=timeout)
+    elapsed = time.perf_counter() - started
+
+    message_ids = []
+    for future in futures:
+        if not future.done():
+            print(f"❌ Publish to {topic_id} did not complete within {timeout}s")
+            message_ids.append(None)
+        elif future.exception() is not None:
+            print(f"❌ Publish to {topic_id} failed: {future.exception()}")
+            message_ids.append(None)
+        else:
+            message_ids.append(future.result())
+
+    failed = message_ids.count(None)
+    with _lock:
+        _stats["calls"] += 1
+        _stats["published"] += len(messages) - failed
+        _stats["failed"] += failed
+        _stats["total_seconds"] += elapsed
+        _stats["max_seconds"] = max(_stats["max_seconds"], elapsed)
+        _stats["max_batch"] = max(_stats["max_batch"], len(messages))
+    print(f"Published {len(messages) - failed}/{len(messages)} messages to {topic_id} in {elapsed * 1000:.0f}ms")
+    return message_ids
+
+def publish(project_id: str, topic_id: str, message: dict, get_credentials=None) -> str | None:
+    return publish_many(project_id, topic_id, [message], get_credentials)[0]
+
+def stats() -> dict:
+    """Publish latency and batch size per publish_many call."""
+    with _lock:
+        calls = _stats["calls"]
+        return {
+            **_stats,
+            "avg_seconds": round(_stats["total_seconds"] / calls, 4) if calls else None,
+            "avg_batch": round((_stats["published"] + _stats["failed"]) / calls, 2) if calls else None,
+        }
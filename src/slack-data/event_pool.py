@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+EVENT_WORKERS = int(os.getenv("SLACK_EVENT_WORKERS", "8"))
+# Events beyond this many queued or running are dropped instead of piling up behind slow work
+MAX_PENDING_EVENTS = int(os.getenv("SLACK_MAX_PENDING_EVENTS", "200"))
+# Slack retries for up to about an hour, so remember event ids at least that long
+EVENT_DEDUPE_TTL = float(os.getenv("SLACK_EVENT_DEDUPE_TTL", "3600"))
+
+@contextmanager
+def stage_timer(event_id: str, stage: str):
+    """Logs how long one stage of handling an event took."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        print(f"[event {event_id}] {stage} took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+class EventPool:
+    """
+    Bounded worker pool for Slack event handling, so listeners can return (and Bolt can ack)
+    right away. Each event_id is only ever run once, however many times Slack delivers it.
+    """
+
+    def __init__(self, workers: int = EVENT_WORKERS, max_pending: int = MAX_PENDING_EVENTS,
+                 dedupe_ttl: float = EVENT_DEDUPE_TTL):
+        self.dedupe_ttl = dedupe_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slack-event")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "duplicates": 0, "dropped": 0, "failed": 0}
+
+    def mark_seen(self, event_id: str) -> bool:
+        """Records event_id, returning False if it was already seen within the TTL."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._seen) > 10000:
+                self._seen = {key: seen for key, seen in self._seen.items() if now - seen <= self.dedupe_ttl}
+            seen = self._seen.get(event_id)
+            if seen is not None and now - seen <= self.dedupe_ttl:
+                self._stats["duplicates"] += 1
+                return False
+            self._seen[event_id] = now
+            return True
+
+    def seen(self, event_id: str) -> bool:
+        """True if event_id was accepted within the TTL, without recording it."""
+        with self._lock:
+            seen = self._seen.get(event_id)
+            return seen is not None and time.monotonic() - seen <= self.dedupe_ttl
+
+    def submit(self, event_id: str, fn, *args) -> bool:
+        """Runs fn(*args) on the pool unless event_id is a duplicate or the pool is full."""
+        if event_id and not self.mark_seen(event_id):
+            print(f"Skipping duplicate Slack event {event_id}")
+            return False
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["dropped"] += 1
+                # Not run, so Slack's retry of this event must still be accepted
+                self._seen.pop(event_id, None)
+            print(f"❌ Event pool full, dropping Slack event {event_id}")
+            return False
+
+        queued_at = time.perf_counter()
+
+        def run():
+            print(f"[event {event_id}] queued for {(time.perf_counter() - queued_at) * 1000:.0f}ms")
+            try:
+                with stage_timer(event_id, fn.__name__):
+                    fn(*args)
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed"] += 1
+                print(f"❌ Slack event {event_id} failed in {fn.__name__}: {e}")
+            finally:
+                self._slots.release()
+
+        with self._lock:
+            self._stats["submitted"] += 1
+        self._executor.submit(run)
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -3,18 +3,22 @@ import json
 import uuid
 import re
 import requests
-import vertexai
+import functools
+import threading
 from datetime import datetime, timezone
 
-from slack_sdk import WebClient
 from slack_bolt import App
-from vertexai.generative_models import GenerativeModel
-from google.cloud import pubsub_v1, firestore
 from google.oauth2.service_account import Credentials as ServiceAccountCredentials
 from slack_bolt.adapter.flask import SlackRequestHandler
 from flask import Flask, request, make_response
 
-from get_secrets import get_secret
+from get_secrets import get_secret, get_many
+import gemini_gateway
+import pubsub_publisher
+from slack_resolvers import ChannelResolver, UserProfileCache
+from slack_outbound import SlackOutbound
+from event_pool import EventPool, stage_timer
+from pending_updates import PendingUpdateStore, FirestoreBackend
 # from adk.linear_tools import update_linear_issue # TODO: add back, removed for cloud run debugging
 
 # --- Config constants ---
@@ -26,26 +30,76 @@ ADK_BASE_URL = "https://adk-service-668646793196.us-central1.run.app"
 ROUTING_AGENT_NAME = "adk"
 
 # --- Secrets ---
-SLACK_BOT_TOKEN = get_secret("SLACK_BOT_TOKEN", PROJECT_ID)
-SLACK_APP_TOKEN = get_secret("SLACK_APP_TOKEN", PROJECT_ID)
-SLACK_SIGNING_SECRET = get_secret("SLACK_SIGNING_SECRET", PROJECT_ID)
-TPM_BOT_USER_ID = get_secret("TPM_BOT_USER_ID", PROJECT_ID)
-
-# --- Slack + Firestore Setup ---
-app = App(token=SLACK_BOT_TOKEN, signing_secret=SLACK_SIGNING_SECRET)
-client = WebClient(SLACK_BOT_TOKEN)
-db = firestore.Client()
-headers = {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"}
-
-handler = SlackRequestHandler(app)
+SECRET_IDS = ("SLACK_BOT_TOKEN", "SLACK_APP_TOKEN", "SLACK_SIGNING_SECRET", "TPM_BOT_USER_ID")
+
+# Event listeners hand work to this pool and return, so Slack gets its ack immediately
+event_pool = EventPool()
 flask_app = Flask(__name__)
 
+# --- Lazy dependencies ---
+# Nothing below runs at import, so a cold start can serve its first request without waiting on
+# Secret Manager, Slack or Firestore for clients that request doesn't need.
+def lazy(build):
+    """Memoizes a zero-argument builder so it runs once, on first use, even with concurrent callers."""
+    lock = threading.Lock()
+    built = []
+
+    @functools.wraps(build)
+    def get():
+        if not built:
+            with lock:
+                if not built:
+                    built.append(build())
+        return built[0]
+    return get
+
+@lazy
+def load_secrets() -> dict:
+    # Fetched concurrently so a cold start pays for one Secret Manager round-trip, not four
+    return get_many(SECRET_IDS, PROJECT_ID)
+
+def secret(secret_id: str) -> str:
+    return load_secrets()[secret_id]
+
+@lazy
+def get_app() -> App:
+    # Skips Bolt's auth.test call at construction, a bad token still fails on the first API call
+    app = App(token=secret("SLACK_BOT_TOKEN"), signing_secret=secret("SLACK_SIGNING_SECRET"),
+              token_verification_enabled=False)
+    app.event("reaction_added")(handle_reaction_added)
+    app.event("message")(handle_message_posted)
+    return app
+
+@lazy
+def get_handler() -> SlackRequestHandler:
+    return SlackRequestHandler(get_app())
+
+@lazy
+def get_pending_updates() -> PendingUpdateStore:
+    pending_updates = PendingUpdateStore(FirestoreBackend())
+    # Approvals are saved by the ADK service, so the pending ts index follows Firestore rather than local saves
+    try:
+        pending_updates.watch()
+    except Exception as e:
+        print(f"Could not watch pending updates, every reaction will be looked up: {e}")
+    return pending_updates
+
+@lazy
+def get_channel_resolver() -> ChannelResolver:
+    return ChannelResolver(secret("SLACK_BOT_TOKEN"))
+
+@lazy
+def get_user_profiles() -> UserProfileCache:
+    return UserProfileCache(secret("SLACK_BOT_TOKEN"))
+
+@lazy
+def get_outbound() -> SlackOutbound:
+    # Replies and deletes go through a paced queue so event handlers never wait on Slack
+    return SlackOutbound(secret("SLACK_BOT_TOKEN"))
+
 # Is this needed?
 def get_service_account_credentials(project_id=PROJECT_ID, secret_id="service-account-key"):
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    response = client.access_secret_version(request={"name": name})
-    key_data = response.payload.data.decode("utf-8")
+    key_data = get_secret(secret_id, project_id)
 
     service_account_info = json.loads(key_data)
     credentials = ServiceAccountCredentials.from_service_account_info(service_account_info)
@@ -61,33 +115,13 @@ def extract_json_block(text):
     match = re.search(r"\[\s*{.*}\s*\]", text, re.DOTALL)
     return match.group(0) if match else None
 
-# Publish data to Google Cloud Pub/Sub
-def publish_to_pubsub(project_id, topic_id, data):
-    credentials = get_service_account_credentials()
-    publisher = pubsub_v1.PublisherClient(credentials=credentials)
-    topic_path = publisher.topic_path(project_id, topic_id)
-    data = json.dumps(data).encode("utf-8")
-    future = publisher.publish(topic_path, data=data)
-    print(f"Published to {topic_id}: {data}")
-    return future.result()
-
 def get_today():
     now = datetime.now(timezone.utc)
     return datetime(now.year, now.month, now.day, tzinfo=timezone.utc).timestamp()
 
 # Function to get channel ID by name
 def get_channel_id(CHANNEL_NAME):
-    url = "https://slack.com/api/conversations.list"
-
-    response = requests.get(url, headers=headers)
-    data = response.json()
-    if not data.get("ok"):
-        raise Exception(f"Error fetching channels: {data.get('error', 'Unknown error')}")
-    
-    for channel in data.get("channels", []):
-        if channel.get("name") == CHANNEL_NAME:
-            return channel["id"]
-    return None
+    return get_channel_resolver().channel_id(CHANNEL_NAME)
 
 def load_prompt(author, message):
     with open("slack-data/prompt.txt", "r") as file:
@@ -95,27 +129,25 @@ def load_prompt(author, message):
     return prompt_template.format(author=author, message=message)
 
 def get_task_list(message, author="Unknown"):
-  # Vertex AI setup
-  credentials = get_service_account_credentials()
-  vertexai.init(project=PROJECT_ID, location=LOCATION, credentials=credentials)
-  model = GenerativeModel("gemini-2.0-flash-lite")
-
-  # Extract tasks/owners using Gemini
+  # Extract tasks/owners using Gemini, credentials are only fetched the first time the gateway initializes
   prompt = load_prompt(author, message)
-  response = model.generate_content(prompt)
+  response = gemini_gateway.generate_content(prompt, call_site="get_task_list", get_credentials=get_service_account_credentials)
   return response.text
 
-# Get channel ID TODO: Is this needed?
-channel_id = get_channel_id(SLACK_CHANNEL_NAME)
-if not channel_id:
-    raise Exception(f"Channel '{SLACK_CHANNEL_NAME}' not found.")
+# Resolved on first use rather than at import, so startup doesn't wait on conversations.list
+def get_standup_channel_id():
+    channel_id = get_channel_id(SLACK_CHANNEL_NAME)
+    if not channel_id:
+        raise Exception(f"Channel '{SLACK_CHANNEL_NAME}' not found.")
+    return channel_id
 
 # Get name of message author (to replace author ID in data)
 def get_message_author(user_id):
-    url = "https://slack.com/api/users.info"
-    params = {"user": user_id}
-    response = requests.get(url, headers=headers, params=params)
-    return response.json().get("user", {}).get("name", user_id)
+    try:
+        return get_user_profiles().get(user_id).get("name", user_id)
+    except Exception as e:
+        print(f"Could not fetch Slack user {user_id}: {e}")
+        return user_id
 
 def buildRequestJson(agentName, user_id, session_id, user_message) -> dict: # Already in agent.py, import or combine?
     new_message = {"role": "User", "parts": [{"text": user_message}]}
@@ -170,38 +202,28 @@ def call_adk_with_dm(user_message: str, user_id: str = "user") -> str:
 
     return collected_text.strip() if collected_text else "No output from ADK."
 
-def save_pending_update(ts: str, data: dict):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc_ref.set(data)
-
-# Load pending update
-def load_pending_update(ts: str):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    else:
-        return None
-
-# Delete pending update
-def delete_pending_update(ts: str):
-    doc_ref = db.collection("pending_updates").document(ts)
-    doc_ref.delete()
-
-@app.event("reaction_added")
-def handle_reaction_added(event, say, client):
+def handle_reaction_added(event, say, body):
+    # Approval requests are always the bot's own messages, and most reactions aren't on one,
+    # so both checks drop unrelated reactions without a Firestore read
+    if event.get("item_user") and event["item_user"] != secret("TPM_BOT_USER_ID"):
+        return
+    if not get_pending_updates().might_contain(event["item"]["ts"]):
+        return
     print("✅ Reaction event received:", json.dumps(event, indent=2))
+    event_pool.submit(body.get("event_id"), process_reaction, event, say)
+
+def process_reaction(event, say):
     ts = event["item"]["ts"]
     reaction = event["reaction"]
     channel_id = event["item"]["channel"]
 
-    update_info = load_pending_update(ts)
+    update_info = get_pending_updates().load(ts)
     if update_info:
         title = update_info["title"]
 
         if reaction == "+1":
             say(channel=channel_id, text=f"👍 Approved! Proceeding with Linear update for: {title}") # Debug message, remove when deployed unless we want to implement
-            client.chat_delete(channel=channel_id, ts=ts)
+            get_outbound().send("chat.delete", channel=channel_id, ts=ts)
 
             # --- TODO: MAKE HELPER METHOD ---
             linear_payload = {
@@ -210,46 +232,53 @@ def handle_reaction_added(event, say, client):
             }
             # print(update_linear_issue(linear_payload)) # Print statement for debugging
 
-            delete_pending_update(ts) # TODO: Delete this line in production (Dan said keep all logs)
+            get_pending_updates().delete(ts) # TODO: Delete this line in production (Dan said keep all logs)
 
         elif reaction == "-1":
             # Try deleting
-            client.chat_delete(channel=channel_id, ts=ts)
-            delete_pending_update(ts)
+            get_outbound().send("chat.delete", channel=channel_id, ts=ts)
+            get_pending_updates().delete(ts)
 
         else:
             print(f"Reaction {reaction} received but no action taken for: {title}")
 
-@app.event("message")
-def handle_message_posted(event, say):
+def handle_message_posted(event, body):
     print("Message event received:", json.dumps(event, indent=2)) # Debug (Delete later)
-    channel_id = event.get("channel", "")
-    user_id = event.get("user", "")
-    text = event.get("text", "")
 
     # Ignore bot messages
-    if user_id == TPM_BOT_USER_ID:
+    if event.get("user", "") == secret("TPM_BOT_USER_ID"):
         print("Skipping message from TPM bot.")
         return
 
+    # Returning right away lets Bolt ack within Slack's 3 second window
+    event_pool.submit(body.get("event_id"), process_message, event, body.get("event_id"))
+
+def process_message(event, event_id=None):
+    channel_id = event.get("channel", "")
+    user_id = event.get("user", "")
+    text = event.get("text", "")
+
     # DM
     if channel_id.startswith("D"):
         # Call ADK with message
-        adk_response = call_adk_with_dm(text, user_id)
-        client.chat_postMessage(channel=channel_id, text=adk_response)
+        with stage_timer(event_id, "adk"):
+            adk_response = call_adk_with_dm(text, user_id)
+        get_outbound().post_message(channel_id, adk_response)
 
     # Channel message
     else:
+        with stage_timer(event_id, "author"):
+            author_name = get_message_author(user_id).replace(".", " ")
         print(f"Channel message in {channel_id} from {author_name}: {text}")
-        author_name = get_message_author(user_id).replace(".", " ")
-        gemini_output = get_task_list(text, author=author_name)
+        with stage_timer(event_id, "gemini"):
+            gemini_output = get_task_list(text, author=author_name)
         cleaned = extract_json_block(gemini_output)
 
         if cleaned:
             try:
                 tasks = json.loads(cleaned)
-                for task in tasks:
-                    publish_to_pubsub(PROJECT_ID, TOPIC_ID, task)
+                with stage_timer(event_id, "publish"):
+                    pubsub_publisher.publish_many(PROJECT_ID, TOPIC_ID, tasks, get_credentials=get_service_account_credentials)
             except json.JSONDecodeError as e:
                 print(f"Error decoding JSON from Gemini output for {author_name}: {e}")
         else:
@@ -257,7 +286,19 @@ def handle_message_posted(event, say):
 
 @flask_app.route("/slack/events", methods=["POST"])
 def slack_events():
-    return handler.handle(request)
+    # A timeout retry only means our ack was late and the first delivery is already being handled.
+    # Other retries (e.g. http_error) may never have reached a listener, so they go through to Bolt
+    # unless the event already ran.
+    retry_num = request.headers.get("X-Slack-Retry-Num")
+    if retry_num:
+        reason = request.headers.get("X-Slack-Retry-Reason")
+        event_id = (request.get_json(silent=True) or {}).get("event_id")
+        if reason == "http_timeout" or (event_id and event_pool.seen(event_id)):
+            print(f"Dropping Slack retry #{retry_num} ({reason}) of event {event_id}")
+            response = make_response("", 200)
+            response.headers["X-Slack-No-Retry"] = "1"
+            return response
+    return get_handler().handle(request)
 
 if __name__ == "__main__":
     flask_app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+
+CONVERSATIONS_LIST_URL = "https://slack.com/api/conversations.list"
+USERS_INFO_URL = "https://slack.com/api/users.info"
+
+# A miss reloads conversations.list at most this often
+CHANNEL_MISS_INTERVAL = float(os.getenv("SLACK_CHANNEL_MISS_INTERVAL", "300"))
+USER_CACHE_SIZE = int(os.getenv("SLACK_USER_CACHE_SIZE", "512"))
+USER_CACHE_TTL = float(os.getenv("SLACK_USER_CACHE_TTL", "3600"))
+# Total seconds one call will spend waiting out 429s before giving up
+MAX_RATE_LIMIT_WAIT = float(os.getenv("SLACK_MAX_RATE_LIMIT_WAIT", "30"))
+
+def _get(url: str, token: str, params: dict) -> dict:
+    """GET a Slack Web API method, waiting out 429s up to MAX_RATE_LIMIT_WAIT, and return the ok response body."""
+    headers = {"Authorization": f"Bearer {token}"}
+    waited = 0.0
+    while True:
+        response = requests.get(url, headers=headers, params=params, timeout=15)
+        if response.status_code == 429:
+            retry_after = float(response.headers.get("Retry-After", "1"))
+            if waited + retry_after > MAX_RATE_LIMIT_WAIT:
+                raise Exception(f"Slack API {url} still rate limited after waiting {waited:.0f}s")
+            time.sleep(retry_after)
+            waited += retry_after
+            continue
+        data = response.json()
+        if not data.get("ok"):
+            raise Exception(f"Slack API error from {url}: {data.get('error', 'Unknown error')}")
+        return data
+
+
+class ChannelResolver:
+    """Channel name -> id map built lazily from every page of conversations.list."""
+
+    def __init__(self, token: str, types: str = "public_channel,private_channel", miss_interval: float = CHANNEL_MISS_INTERVAL):
+        self.token = token
+        self.types = types
+        self.miss_interval = miss_interval
+        self._ids = {}
+        self._attempted_at = None
+        self._lock = threading.Lock()
+
+    def channel_id(self, name: str) -> str | None:
+        name = name.lstrip("#")
+        with self._lock:
+            if name in self._ids:
+                return self._ids[name]
+            # Measured from the last attempt, so a failing conversations.list isn't re-crawled on every miss
+            if self._attempted_at is None or time.monotonic() - self._attempted_at > self.miss_interval:
+                self._attempted_at = time.monotonic()
+                self._load()
+            return self._ids.get(name)
+
+    def _load(self):
+        ids, cursor = {}, None
+        while True:
+            params = {"types": self.types, "exclude_archived": "true", "limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            data = _get(CONVERSATIONS_LIST_URL, self.token, params)
+            for channel in data.get("channels", []):
+                ids[channel["name"]] = channel["id"]
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+        self._ids = ids
+
+
+class UserProfileCache:
+    """LRU cache of users.info results that expire after ttl seconds."""
+
+    def __init__(self, token: str, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.token = token
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached and now - cached[0] <= self.ttl:
+                self._users.move_to_end(user_id)
+                return cached[1]
+
+        user = _get(USERS_INFO_URL, self.token, {"user": user_id}).get("user", {})
+
+        with self._lock:
+            self._users[user_id] = (now, user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+        return user
@@ -0,0 +1,89 @@
+"""
+Measures cold start of the Slack ingress service: the import of get_slack_data and the time until
+it answers its first request, a signed url_verification event. Secret Manager is replaced with a
+local fake that sleeps for --secret-latency per call, so nothing leaves the machine.
+
+    python slack-data/startup_benchmark.py [--secret-latency 0.15] [--max-seconds 2]
+
+Run from src/. Exits non-zero if import-to-first-response exceeds --max-seconds.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+FAKE_SECRETS = {
+    "SLACK_BOT_TOKEN": "xoxb-benchmark",
+    "SLACK_APP_TOKEN": "xapp-benchmark",
+    "SLACK_SIGNING_SECRET": "benchmark-signing-secret",
+    "TPM_BOT_USER_ID": "UBENCHMARK",
+}
+
+class FakeSecretManager:
+    """Answers access_secret_version from FAKE_SECRETS after sleeping for latency seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def access_secret_version(self, request):
+        self.calls += 1
+        time.sleep(self.latency)
+        secret_id = request["name"].split("/")[3]
+        return SimpleNamespace(payload=SimpleNamespace(data=FAKE_SECRETS[secret_id].encode("utf-8")))
+
+def install_fake_secrets(latency: float) -> FakeSecretManager:
+    import get_secrets
+    fake = FakeSecretManager(latency)
+    get_secrets._provider = get_secrets.SecretProvider(client=fake)
+    return fake
+
+def signed_request(body: str) -> dict:
+    timestamp = str(int(time.time()))
+    base = f"v0:{timestamp}:{body}".encode("utf-8")
+    signature = "v0=" + hmac.new(FAKE_SECRETS["SLACK_SIGNING_SECRET"].encode("utf-8"), base, hashlib.sha256).hexdigest()
+    return {
+        "Content-Type": "application/json",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": signature,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import-to-first-response time of get_slack_data.")
+    parser.add_argument("--secret-latency", type=float, default=0.15, help="simulated seconds per Secret Manager call")
+    parser.add_argument("--max-seconds", type=float, default=None, help="fail if import-to-first-response is slower")
+    args = parser.parse_args()
+
+    secret_manager = install_fake_secrets(args.secret_latency)
+
+    started = time.perf_counter()
+    import get_slack_data
+    imported = time.perf_counter()
+
+    body = json.dumps({"type": "url_verification", "token": "benchmark", "challenge": "benchmark-challenge"})
+    response = get_slack_data.flask_app.test_client().post("/slack/events", data=body, headers=signed_request(body))
+    responded = time.perf_counter()
+
+    results = {
+        "import_seconds": round(imported - started, 3),
+        "first_response_seconds": round(responded - imported, 3),
+        "import_to_first_response_seconds": round(responded - started, 3),
+        "first_response_status": response.status_code,
+        "secret_calls": secret_manager.calls,
+    }
+    print(json.dumps(results, indent=2))
+
+    if response.status_code != 200:
+        raise SystemExit(f"First request failed with {response.status_code}: {response.get_data(as_text=True)}")
+    if args.max_seconds is not None and responded - started > args.max_seconds:
+        raise SystemExit(f"Cold start took {responded - started:.3f}s, over the {args.max_seconds}s budget")
+
+if __name__ == "__main__":
+    main()
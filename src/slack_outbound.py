@@ -0,0 +1,240 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+SLACK_API_URL = "https://slack.com/api/"
+
+OUTBOUND_WORKERS = int(os.getenv("SLACK_OUTBOUND_WORKERS", "4"))
+OUTBOUND_MAX_RETRIES = int(os.getenv("SLACK_OUTBOUND_MAX_RETRIES", "5"))
+# chat.postMessage allows roughly one message per second per channel, with short bursts
+CHANNEL_RATE = float(os.getenv("SLACK_CHANNEL_MESSAGES_PER_SECOND", "1"))
+CHANNEL_BURST = int(os.getenv("SLACK_CHANNEL_BURST", "3"))
+
+# Requests per minute for Slack's Web API rate tiers
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "chat.delete": 3,
+    "chat.update": 3,
+    "reactions.add": 3,
+    "conversations.open": 3,
+    "users.info": 4,
+}
+# Methods paced per channel rather than per workspace
+CHANNEL_PACED_METHODS = {"chat.postMessage"}
+
+class _Bucket:
+    """Token bucket that reports how long until a token is available instead of blocking."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True for failures before the request reached Slack, which are safe to retry."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+class _Job:
+    def __init__(self, method: str, params: dict):
+        self.method = method
+        self.params = params
+        self.future = Future()
+        self.attempts = 0
+
+
+class SlackOutbound:
+    """
+    Queue of outbound Slack Web API calls, sent by worker threads.
+
+    Each call is paced by a token bucket for its method's rate tier and, for chat.postMessage,
+    one per channel. 429s are retried after Retry-After without blocking other channels, and so are
+    connection failures from before the request went out. Timeouts and 5xx responses are reported
+    on the future instead, since Slack may already have posted the message.
+    send() returns a Future resolving to Slack's response body, so callers can fire and forget,
+    attach a callback, or wait. An identical send made while the first is still queued or in flight
+    shares its future; once that completes, whether delivered or failed, the next one goes out again.
+    """
+
+    def __init__(self, token: str, workers: int = OUTBOUND_WORKERS, max_retries: int = OUTBOUND_MAX_RETRIES):
+        self.token = token
+        self.workers = workers
+        self.max_retries = max_retries
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json; charset=utf-8",
+        })
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._inflight = {}
+        self._buckets = {}
+        self._bucket_lock = threading.Lock()
+        self._threads = []
+        self._stats = {"sent": 0, "coalesced": 0, "rate_limited": 0, "retries": 0, "failed": 0}
+
+    def send(self, method: str, callback=None, **params) -> Future:
+        """Queues a Web API call. callback(future) runs on a worker thread once it completes."""
+        key = method + json.dumps(params, sort_keys=True, default=str)
+        with self._cond:
+            self._start_workers()
+            self._prune_inflight()
+            job = self._inflight.get(key)
+            if job is not None:
+                self._stats["coalesced"] += 1
+            else:
+                job = _Job(method, params)
+                self._inflight[key] = job
+                self._push(job, time.monotonic())
+        if callback:
+            job.future.add_done_callback(callback)
+        return job.future
+
+    def post_message(self, channel: str, text: str, callback=None, **params) -> Future:
+        return self.send("chat.postMessage", callback=callback, channel=channel, text=text, **params)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._stats, "queued": len(self._heap)}
+
+    # --- Internals ---
+    def _start_workers(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"slack-outbound-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _push(self, job: _Job, not_before: float):
+        heapq.heappush(self._heap, (not_before, next(self._seq), job))
+        self._cond.notify()
+
+    def _prune_inflight(self):
+        # A completed send is never reused: a repeat after delivery is a new message, and a failed
+        # future would fail every caller that joined it
+        for key in [key for key, job in self._inflight.items() if job.future.done()]:
+            del self._inflight[key]
+
+    def _buckets_for(self, job: _Job) -> list[_Bucket]:
+        buckets = []
+        tier = METHOD_TIERS.get(job.method)
+        if tier:
+            per_minute = TIER_LIMITS[tier]
+            buckets.append(self._bucket(job.method, per_minute / 60, max(1, per_minute // 10)))
+        if job.method in CHANNEL_PACED_METHODS and job.params.get("channel"):
+            buckets.append(self._bucket(f"channel:{job.params['channel']}", CHANNEL_RATE, CHANNEL_BURST))
+        return buckets
+
+    def _bucket(self, name: str, rate: float, capacity: float) -> _Bucket:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = _Bucket(rate, capacity)
+        return bucket
+
+    def _reserve(self, job: _Job) -> float:
+        """Takes a token from every bucket the job needs, or returns how long to wait if any is empty."""
+        with self._bucket_lock:
+            now = time.monotonic()
+            buckets = self._buckets_for(job)
+            delay = max((bucket.delay(now) for bucket in buckets), default=0.0)
+            if delay == 0:
+                for bucket in buckets:
+                    bucket.take()
+            return delay
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            delay = self._reserve(job)
+            if delay > 0:
+                with self._cond:
+                    self._push(job, time.monotonic() + delay)
+                continue
+            self._deliver(job)
+
+    def _deliver(self, job: _Job):
+        job.attempts += 1
+        rate_limited = False
+        try:
+            response = self._session.post(SLACK_API_URL + job.method, json=job.params, timeout=15)
+            if response.status_code == 429:
+                rate_limited = True
+                retry_after = float(response.headers.get("Retry-After", "1"))
+            elif response.status_code >= 500:
+                self._fail(job, Exception(f"Slack {job.method} returned {response.status_code}"))
+                return
+            else:
+                data = response.json()
+                retry_after = None
+        except requests.RequestException as e:
+            if not _not_sent(e):
+                self._fail(job, e)
+                return
+            print(f"Slack {job.method} attempt {job.attempts} could not connect: {e}")
+            retry_after = min(2 ** job.attempts, 30)
+        except ValueError as e:
+            self._fail(job, Exception(f"Unreadable Slack {job.method} response: {e}"))
+            return
+
+        if retry_after is not None:
+            if job.attempts > self.max_retries:
+                self._fail(job, Exception(f"Slack {job.method} still failing after {job.attempts} attempts"))
+                return
+            if rate_limited:
+                # The limit applies to every call sharing this method or channel, not just this one
+                with self._bucket_lock:
+                    for bucket in self._buckets_for(job):
+                        bucket.pause(retry_after)
+            with self._cond:
+                self._stats["retries"] += 1
+                self._stats["rate_limited"] += rate_limited
+                self._push(job, time.monotonic() + retry_after)
+            return
+
+        if not data.get("ok"):
+            print(f"❌ Slack {job.method} failed: {data.get('error')}")
+        with self._cond:
+            self._stats["sent"] += 1
+        job.future.set_result(data)
+
+    def _fail(self, job: _Job, error: Exception):
+        print(f"❌ Giving up on Slack {job.method}: {error}")
+        with self._cond:
+            self._stats["failed"] += 1
+        job.future.set_exception(error)